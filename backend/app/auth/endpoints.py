@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Body, HTTPException, Request
+from fastapi import APIRouter, Depends, Body, HTTPException, Request, BackgroundTasks
 from app.core.security.helpers import password_authenticated_user, client_id_authenticated_user
 from app.auth.model import SocialLoginRequest, Token
 
@@ -10,12 +10,10 @@ from app.core.security.social import provider_map
 from app.core.config import settings
 from app.user.model import User
 from app.auth.service import AuthService
+from app.core.cache.response_cache import invalidate
 from app.utills.dependencies import get_auth_service, validate_refresh_token, validate_link_token
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from app.core.rate_limit import limiter
 
 auth_router = APIRouter(tags=["Authentication"], prefix="/auth")
 
@@ -24,6 +22,7 @@ auth_router = APIRouter(tags=["Authentication"], prefix="/auth")
 @limiter.limit("10/minute")
 async def login_ep(
         request: Request,
+        bg: BackgroundTasks,
         form: CustomOAuth2RequestForm = Depends(),
         auth_service: AuthService = Depends(get_auth_service)
 ) -> RefreshToken:
@@ -59,11 +58,10 @@ async def login_ep(
             roles=user_role_names
         )
 
-    user.log_login(payload={
+    bg.add_task(User.record_login, user.id, {
         "source": "token_login",
         "provider": provider,
     })
-    await user.save()
 
     return RefreshToken(
         accessToken=access_token,
@@ -78,22 +76,23 @@ async def login_ep(
 async def social_login_ep(
         request: Request,
         req: SocialLoginRequest,
+        bg: BackgroundTasks,
         auth_service: AuthService = Depends(get_auth_service)
 ) -> RefreshToken:
     exchange = provider_map.get(req.provider)
     if exchange is None:
         raise HTTPException(status_code=400, detail=f"Unsupported provider: {req.provider}")
     email = await exchange(req.data, req.redirect_url)
-    user = await User.by_email(email)
+    user = await User.by_email_for_auth(email)
+    is_new_user = user is None
 
-    if user is None:
+    if is_new_user:
         if not settings.allow_new_users:
             raise HTTPException(
                 status_code=403,
                 detail="New users are not allowed in this environment",
             )
         user = User(email=email, source=req.provider)
-        await user.save()
 
     scopes, user_role_names = await user.get_user_scopes_and_roles()
 
@@ -103,11 +102,16 @@ async def social_login_ep(
         roles=user_role_names
     )
 
-    user.log_login(payload={
+    login_payload = {
         "source": "social_login",
         "provider": req.provider,
-    })
-    await user.save()
+    }
+    if is_new_user:
+        user.log_login(payload=login_payload)
+        await user.insert()
+        invalidate("users")
+    else:
+        bg.add_task(User.record_login, user.id, login_payload)
 
     return RefreshToken(
         accessToken=tokens["access_token"],
@@ -124,20 +128,27 @@ async def refresh(
         token_data: Token = Depends(validate_refresh_token),
         auth_service: AuthService = Depends(get_auth_service)
 ) -> RefreshToken:
-    """Returns a new access token from a refresh token"""
-    user = await User.by_email(token_data.sub)
-    scopes, user_role_names = await user.get_user_scopes_and_roles()
+    """Returns a new access token from a refresh token, with the user's current scopes and roles"""
+    user = await User.by_email_for_refresh(token_data.sub)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Inactive user")
+    if token_data.client_id:
+        # API key tokens carry no role claims; the key's scopes are checked per request
+        scopes, roles = None, None
+    else:
+        # Read from the same projected lookup, so role changes reach refreshed tokens
+        scopes, roles = await user.get_user_scopes_and_roles()
     access_token, at_expires = auth_service.create_access_token(
-        subject=user.email,
+        subject=token_data.sub,
         client_id=token_data.client_id,
         scopes=scopes,
-        roles=user_role_names
+        roles=roles
     )
     refresh_token, rt_expires = auth_service.create_refresh_token(
-        subject=user.email,
+        subject=token_data.sub,
         client_id=token_data.client_id,
-        scopes=token_scopes,
-        roles=token_roles
+        scopes=scopes,
+        roles=roles
     )
 
     return RefreshToken(
@@ -152,10 +163,13 @@ async def refresh(
 @limiter.limit("10/minute")
 async def validate_magic_link(
         request: Request,
+        bg: BackgroundTasks,
         token_data=Depends(validate_link_token),
         auth_service: AuthService = Depends(get_auth_service)
 ) -> RefreshToken:
-    user = await User.by_email(token_data.sub)
+    user = await User.by_email_for_auth(token_data.sub)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     scopes, user_role_names = await user.get_user_scopes_and_roles()
     tokens = auth_service.create_token_pair(
         subject=user.email,
@@ -163,11 +177,10 @@ async def validate_magic_link(
         scopes=scopes,
         roles=user_role_names
     )
-    user.log_login(payload={
+    bg.add_task(User.record_login, user.id, {
         "source": "magic_link",
         "provider": "email",
     })
-    await user.save()
     return RefreshToken(
         accessToken=tokens["access_token"],
         accessTokenExpires=tokens["access_expires_at"],
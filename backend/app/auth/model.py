@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, model_validator, EmailStr, Field
+from typing import Optional, List
+from pydantic import BaseModel, computed_field, EmailStr, Field
 
 
 class AccessToken(BaseModel):
@@ -9,12 +9,11 @@ class AccessToken(BaseModel):
 
     accessToken: str = Field(description="JWT access token string")
     accessTokenExpires: datetime = Field(description="When the access token expires")
-    access_token: Optional[str] = Field(default=None, description="Alternative access token field")
 
-    @model_validator(mode="before")
-    def validate_access_token(cls, values: dict):
-        values["access_token"] = values["accessToken"]
-        return values
+    @computed_field(description="Alternative access token field")
+    @property
+    def access_token(self) -> str:
+        return self.accessToken
 
 
 class RefreshToken(AccessToken):
@@ -54,6 +53,8 @@ class Token(BaseModel):
     exp: int = Field(description="Expiration timestamp")
     domain: Optional[dict] = Field(default=None, description="Domain-specific data")
     client_id: Optional[str] = Field(default=None, description="Client ID that requested the token")
+    scopes: List[str] = Field(default_factory=list, description="Scopes granted when the token was issued")
+    roles: List[str] = Field(default_factory=list, description="Role names granted when the token was issued")
     iat: datetime = Field(description="Issued at timestamp")
 
     @property
@@ -1,15 +1,23 @@
-from datetime import datetime, UTC, timedelta
+import hashlib
+import time
+from datetime import datetime, UTC
 from typing import Union, Optional, Any, List, Tuple
 import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException
 from loguru import logger
-from password_strength import PasswordPolicy
 from pydantic import ValidationError
 from starlette import status
 
 from app.core.config import settings
 from app.auth.model import Token, Policy, RefreshTokenReq, NewPassword
 
+DECODED_TOKEN_CACHE_TTL_SECONDS = 60
+DECODED_TOKEN_CACHE_MAX_SIZE = 50_000
+
+# Tokens that already passed signature verification, mapped to (exp, payload)
+_decoded_tokens: TTLCache = TTLCache(maxsize=DECODED_TOKEN_CACHE_MAX_SIZE, ttl=DECODED_TOKEN_CACHE_TTL_SECONDS)
+
 
 class SecurityExceptions:
     INVALID_TOKEN_FORMAT = HTTPException(
@@ -30,6 +38,16 @@ class SecurityExceptions:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    INVALID_API_KEY_NO_USER = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid API Key: No matching user found.",
+    )
+
+    INVALID_API_KEY_DUPLICATE = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid API Key: More than one matching user.",
+    )
+
     WEAK_PASSWORD = HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="Password does not meet security requirements",
@@ -43,36 +61,37 @@ class SecurityService:
                  jwt_secret_key: str = settings.secret_key,
                  jwt_refresh_secret_key: str = settings.authjwt_refresh_key,
                  ):
-        self.password_policy = PasswordPolicy.from_names(
-            **password_policy.model_dump()
-        )
+        self.password_policy = password_policy
         self.jwt_secret_key = jwt_secret_key
         self.jwt_refresh_secret_key = jwt_refresh_secret_key
         self.algorithm = algorithm
 
     def validate_password_strength(self, password: str) -> bool:
-        from password_strength import tests
-        errors = []
-        issues = self.password_policy.test(password)
-        for error in issues:
-            if isinstance(error, tests.Length):
-                errors.append(
-                    f"Password should be at least {error.length} characters long."
-                )
-            elif isinstance(error, tests.Numbers):
-                errors.append(f"Password should have at least {error.count} digits.")
-            elif isinstance(error, tests.NonLetters):
-                errors.append(
-                    f"Password should have at least {error.count} special characters."
-                )
-            elif isinstance(error, tests.Uppercase):
-                errors.append(
-                    f"Password should have at least {error.count} uppercase letters."
-                )
-        if issues:
-            logger.warning(f"Password validation failed: {issues}")
+        policy = self.password_policy
+        if len(password) < policy.length:
+            logger.warning(f"Password validation failed: shorter than {policy.length} characters")
             raise SecurityExceptions.WEAK_PASSWORD
-        return True
+
+        # Count every character class in a single pass instead of one pass per policy test
+        letters = uppercase = numbers = 0
+        for char in password:
+            if char.isalpha():
+                letters += 1
+                if char.isupper():
+                    uppercase += 1
+            elif char.isnumeric():
+                numbers += 1
+
+        if numbers < policy.numbers:
+            failure = f"fewer than {policy.numbers} digits"
+        elif len(password) - letters < policy.nonletters:
+            failure = f"fewer than {policy.nonletters} special characters"
+        elif uppercase < policy.uppercase:
+            failure = f"fewer than {policy.uppercase} uppercase letters"
+        else:
+            return True
+        logger.warning(f"Password validation failed: {failure}")
+        raise SecurityExceptions.WEAK_PASSWORD
 
     def create_token(self,
                      subject: Union[str, Any],
@@ -81,21 +100,29 @@ class SecurityService:
                      client_id: Optional[str] = None,
                      scopes: Optional[List] = None,
                      roles: Optional[List] = None) -> Tuple[str, datetime]:
-        exp = datetime.now(UTC) + timedelta(minutes=expires_minutes)
+        # One clock read, as epoch seconds PyJWT can write as-is
+        now = int(time.time())
+        exp = now + expires_minutes * 60
         payload = {
             "sub": subject,
             "exp": exp,
             "client_id": client_id,
             "scopes": scopes or [],
             "roles": roles or [],
-            "iat": datetime.now(UTC),  # Add issued at time
+            "iat": now,  # Add issued at time
         }
         encoded = jwt.encode(payload, secret_key, self.algorithm)
-        return encoded, exp
+        return encoded, datetime.fromtimestamp(exp, UTC)
 
     def _decode_token(self, token: str, secret_key: str, verify_exp: bool = True) -> dict:
+        # Keyed by the secret too, so access and refresh tokens never share entries
+        cache_key = hashlib.blake2b(token.encode(), digest_size=16, key=secret_key.encode()[:64]).digest()
+        if verify_exp:
+            hit = _decoded_tokens.get(cache_key)
+            if hit is not None and hit[0] > time.time():
+                return dict(hit[1])
         try:
-            return jwt.decode(
+            payload = jwt.decode(
                 token,
                 secret_key,
                 algorithms=[self.algorithm],
@@ -107,6 +134,10 @@ class SecurityService:
         except jwt.PyJWTError as e:
             logger.error(f"Token validation failed: {e}")
             raise SecurityExceptions.INVALID_CREDENTIALS
+        exp = payload.get("exp")
+        if verify_exp and isinstance(exp, (int, float)):
+            _decoded_tokens[cache_key] = (exp, payload)
+        return dict(payload)
 
     def validate_token(self, token: str, secret_key: str) -> Token:
         try:
@@ -196,12 +227,17 @@ class AuthService:
             "refresh_expires_at": refresh_exp,
         }
 
-    def refresh_access_token(self, refresh_token_req: RefreshTokenReq) -> dict:
+    def refresh_access_token(self,
+                             refresh_token_req: RefreshTokenReq,
+                             scopes: Optional[List] = None,
+                             roles: Optional[List] = None
+                             ) -> dict:
+        """Mint an access token from a refresh token, with the user's current scopes and roles passed in"""
         token_data = self.security_service.validate_refresh_token(refresh_token_req.refreshToken)
         access_token, access_exp = self.create_access_token(
             subject=token_data.sub,
-            scopes=token_data.scopes,
-            roles=token_data.roles,
+            scopes=scopes,
+            roles=roles,
             client_id=token_data.client_id
         )
 
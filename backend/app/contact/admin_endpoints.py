@@ -1,4 +1,8 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+
+from beanie import PydanticObjectId
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 
 from app.contact.model import MessageOut, MessageUpdate, MessageReply, MessageStatus, UnreadCount
 from app.contact.service import MessageService
@@ -35,12 +39,20 @@ async def get_unread_count(
 )
 async def list_messages(
     status: MessageStatus | None = None,
-    skip: int = 0,
-    limit: int = 50,
+    before: datetime | None = Query(None, description="Return messages created before this cursor (X-Next-Before of the previous page)"),
+    before_id: PydanticObjectId | None = Query(None, description="Tie-breaker for the before cursor (X-Next-Before-Id of the previous page)"),
+    limit: int = Query(50, ge=1, le=200),
     service: MessageService = Depends(get_message_service),
-) -> list[MessageOut]:
-    messages = await service.list_messages(status=status, skip=skip, limit=limit)
-    return [MessageOut.from_doc(m) for m in messages]
+) -> ORJSONResponse:
+    messages = await service.list_messages(status=status, before=before, before_id=before_id, limit=limit)
+    headers = None
+    if len(messages) == limit:
+        headers = {
+            "X-Next-Before": messages[-1].created_at.isoformat(),
+            "X-Next-Before-Id": str(messages[-1].id),
+        }
+    # Already shaped from our own documents: skip FastAPI's response_model re-validation and encoder pass
+    return ORJSONResponse(content=[MessageOut.from_doc(m).model_dump(mode="json") for m in messages], headers=headers)
 
 
 @admin_message_router.get(
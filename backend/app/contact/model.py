@@ -1,7 +1,8 @@
 from datetime import datetime, UTC
 from enum import Enum
-from beanie import Document
-from pydantic import BaseModel, Field, EmailStr
+from functools import partial
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator
 from pymongo import IndexModel, ASCENDING
 
 
@@ -25,17 +26,29 @@ class ReplyAuthor(str, Enum):
 class Reply(BaseModel):
     text: str
     author: ReplyAuthor = ReplyAuthor.agent
-    sent_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    sent_at: datetime = Field(default_factory=partial(datetime.now, UTC))
+
+
+def normalize_email(email: str) -> str:
+    """Canonical sender email, so the pending lock sees one sender whatever the casing"""
+    return email.strip().lower()
 
 
 class MessageCreate(BaseModel):
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
     name: str = Field(min_length=1, max_length=200, description="Sender's name")
     email: EmailStr = Field(description="Sender's email address")
     message: str = Field(min_length=1, max_length=5000, description="Message body")
 
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, v: str) -> str:
+        return normalize_email(v)
+
 
 class Message(Document, MessageCreate):
-    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), description="When the message was received")
+    created_at: datetime = Field(default_factory=partial(datetime.now, UTC), description="When the message was received")
     status: MessageStatus = Field(default=MessageStatus.pending, description="Message processing status")
     priority: MessagePriority = Field(default=MessagePriority.medium, description="Message priority")
     replies: list[Reply] = Field(default_factory=list)
@@ -46,18 +59,42 @@ class Message(Document, MessageCreate):
         name = "Message"
         indexes = [
             IndexModel(
-                [("email", ASCENDING), ("created_at", ASCENDING), ("status", ASCENDING)],
-                unique=True,
-                name="email_created_at_status_unique"
+                [("email", ASCENDING), ("status", ASCENDING)],
+                partialFilterExpression={"status": {"$in": [MessageStatus.pending.value, MessageStatus.open.value]}},
+                name="email_open_pending_idx"
             ),
             IndexModel([("email", ASCENDING)], name="email_idx"),
-            IndexModel([("created_at", ASCENDING)], name="created_at_idx"),
+            IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id_idx"),
         ]
 
     def __repr__(self) -> str:
         return f"<Message from={self.email}>"
 
 
+class MessageListItem(BaseModel):
+    """Inbox projection of a message, carrying only its latest reply"""
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    email: str
+    message: str
+    status: MessageStatus
+    created_at: datetime
+    replies: list[Reply] = Field(default_factory=list)
+    unread_by_agent: bool = False
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "name": 1,
+            "email": 1,
+            "message": 1,
+            "status": 1,
+            "created_at": 1,
+            "replies": {"$slice": -1},
+            "unread_by_agent": 1,
+        }
+
+
 class MessageUpdate(BaseModel):
     status: MessageStatus
 
@@ -85,8 +122,9 @@ class MessageOut(BaseModel):
     unread_by_agent: bool = False
 
     @classmethod
-    def from_doc(cls, doc: "Message") -> "MessageOut":
-        return cls(
+    def from_doc(cls, doc: "Message | MessageListItem") -> "MessageOut":
+        # Fields come straight from a validated document, so skip re-validation
+        return cls.model_construct(
             id=str(doc.id),
             name=doc.name,
             email=str(doc.email),
@@ -109,7 +147,7 @@ class ThreadOut(BaseModel):
 
     @classmethod
     def from_doc(cls, doc: "Message") -> "ThreadOut":
-        return cls(
+        return cls.model_construct(
             id=str(doc.id),
             name=doc.name,
             message=doc.message,
@@ -0,0 +1,42 @@
+import hashlib
+from datetime import datetime, UTC, timedelta
+
+from beanie.operators import In
+from loguru import logger
+from redis.exceptions import RedisError
+
+from app.contact.model import Message, MessageStatus, normalize_email
+from app.core.redis_client import redis_client
+
+PENDING_WINDOW = timedelta(hours=8)
+
+
+def _pending_key(email: str) -> str:
+    return f"contact:pending:{hashlib.sha1(email.encode()).hexdigest()}"
+
+
+async def acquire_pending(email: str) -> bool:
+    """Claim the sender's pending slot, False while a previous message is still pending or open."""
+    email = normalize_email(email)
+    if redis_client is not None:
+        try:
+            return bool(await redis_client.set(_pending_key(email), "1", nx=True, ex=int(PENDING_WINDOW.total_seconds())))
+        except RedisError as e:
+            logger.warning("Pending lock unavailable in Redis, checking Mongo instead: {}", e)
+    existing = await Message.find_one(
+        Message.email == email,
+        In(Message.status, [MessageStatus.pending, MessageStatus.open]),
+        Message.created_at >= datetime.now(UTC) - PENDING_WINDOW,
+    )
+    return existing is None
+
+
+async def release_pending(email: str) -> None:
+    """Free the sender's pending slot once their message is closed or removed."""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.delete(_pending_key(normalize_email(email)))
+    except RedisError as e:
+        # The key still expires with PENDING_WINDOW
+        logger.warning("Could not release pending lock in Redis: {}", e)
@@ -1,27 +1,46 @@
+from datetime import datetime
+
 from beanie import PydanticObjectId
+from beanie.operators import And, Or
 from fastapi import HTTPException
 from loguru import logger
 
-from app.contact.model import Message, MessageStatus, Reply, ReplyAuthor
+from app.contact.model import Message, MessageListItem, MessageStatus, Reply, ReplyAuthor
+from app.contact.pending_lock import acquire_pending, release_pending
 from app.contact.thread_auth import build_magic_link, mint_thread_token
+from app.core.cache.response_cache import cached, invalidate
 from app.utills.email.email import EmailService
 
 
 MAX_REPLIES = 30
 
+# Statuses that keep the sender's pending slot taken
+_HOLDS_PENDING = (MessageStatus.pending, MessageStatus.open)
+
 
 class MessageService:
 
+    @cached("messages", key=lambda self, status=None, before=None, before_id=None, limit=50: (status, before, before_id, limit))
     async def list_messages(
         self,
         status: MessageStatus | None = None,
-        skip: int = 0,
+        before: datetime | None = None,
+        before_id: PydanticObjectId | None = None,
         limit: int = 50,
-    ) -> list[Message]:
+    ) -> list[MessageListItem]:
+        """Newest messages first, paging on (created_at, _id) so each page is an index seek"""
         query = Message.find()
         if status is not None:
             query = query.find(Message.status == status)
-        return await query.sort("-created_at").skip(skip).limit(limit).to_list()
+        if before is not None and before_id is not None:
+            # _id breaks created_at ties, so messages sharing a timestamp are neither skipped nor repeated
+            query = query.find(Or(
+                Message.created_at < before,
+                And(Message.created_at == before, Message.id < before_id),
+            ))
+        elif before is not None:
+            query = query.find(Message.created_at < before)
+        return await query.sort("-created_at", "-_id").limit(limit).project(MessageListItem).to_list()
 
     async def get_message(self, message_id: str) -> Message:
         try:
@@ -35,8 +54,15 @@ class MessageService:
 
     async def update_status(self, message_id: str, status: MessageStatus) -> Message:
         msg = await self.get_message(message_id)
+        previous = msg.status
         msg.status = status
         await msg.save()
+        invalidate("messages")
+        if status == MessageStatus.closed and previous in _HOLDS_PENDING:
+            await release_pending(msg.email)
+        elif status in _HOLDS_PENDING and previous == MessageStatus.closed:
+            # Reopened, so the sender's slot is taken again
+            await acquire_pending(msg.email)
         logger.info("Updated message {} status to {}", message_id, status)
         return msg
 
@@ -45,6 +71,7 @@ class MessageService:
         if msg.unread_by_agent:
             msg.unread_by_agent = False
             await msg.save()
+            invalidate("messages")
         return msg
 
     async def mark_unread(self, message_id: str) -> Message:
@@ -52,11 +79,15 @@ class MessageService:
         if not msg.unread_by_agent:
             msg.unread_by_agent = True
             await msg.save()
+            invalidate("messages")
         return msg
 
     async def delete_message(self, message_id: str) -> None:
         msg = await self.get_message(message_id)
         await msg.delete()
+        invalidate("messages")
+        if msg.status in _HOLDS_PENDING:
+            await release_pending(msg.email)
         logger.info("Deleted message {}", message_id)
 
     async def reply(
@@ -84,6 +115,7 @@ class MessageService:
             msg.status = MessageStatus.open
         msg.unread_by_agent = False
         await msg.save()
+        invalidate("messages")
         logger.info("Sent reply to {} for message {}", msg.email, message_id)
         return msg
 
@@ -98,6 +130,7 @@ class MessageService:
         msg.replies = msg.replies[-MAX_REPLIES:]
         msg.unread_by_agent = True
         await msg.save()
+        invalidate("messages")
         logger.info("Visitor reply appended to message {}", message_id)
         return msg
 
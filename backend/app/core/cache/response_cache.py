@@ -0,0 +1,39 @@
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+from cachetools import TTLCache
+
+# Caches are per process. invalidate() clears only the worker that handled the write, so under
+# several workers the others may serve a listing up to this many seconds old. Kept short for that reason.
+RESPONSE_CACHE_TTL_SECONDS = 5
+RESPONSE_CACHE_MAX_SIZE = 256
+
+_namespaces: dict[str, TTLCache] = {}
+
+
+def cached(namespace: str, key: Callable[..., Hashable], ttl: int = RESPONSE_CACHE_TTL_SECONDS):
+    """
+    Cache an async read's result under a namespace, keyed by `key(*args, **kwargs)`.
+    Writers call `invalidate(namespace)` so readers in the same process never serve data older than
+    their own mutation; other worker processes catch up within the TTL.
+    """
+    cache = _namespaces.setdefault(namespace, TTLCache(maxsize=RESPONSE_CACHE_MAX_SIZE, ttl=ttl))
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            if cache_key in cache:
+                return cache[cache_key]
+            result = await func(*args, **kwargs)
+            cache[cache_key] = result
+            return result
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces: str) -> None:
+    """Drop every cached entry in the given namespaces."""
+    for namespace in namespaces:
+        if namespace in _namespaces:
+            _namespaces[namespace].clear()
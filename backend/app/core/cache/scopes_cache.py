@@ -0,0 +1,55 @@
+import asyncio
+from collections import defaultdict
+from typing import List
+
+from beanie import PydanticObjectId
+from cachetools import TTLCache
+
+from app.role.model import Role, RoleScopesView
+
+SCOPES_CACHE_TTL_SECONDS = 30
+SCOPES_CACHE_MAX_SIZE = 10_000
+
+_role_set_cache: TTLCache = TTLCache(maxsize=SCOPES_CACHE_MAX_SIZE, ttl=SCOPES_CACHE_TTL_SECONDS)
+_role_ids_cache: TTLCache = TTLCache(maxsize=1024, ttl=300)
+# One lock per role set, so only concurrent misses on the same set wait for each other
+_role_set_locks: defaultdict[tuple, asyncio.Lock] = defaultdict(asyncio.Lock)
+# Bumped by clear_scopes so a lookup that raced a role change does not store what it read
+_generation = 0
+
+
+async def cached_role_ids(names: List[str]) -> dict[str, PydanticObjectId]:
+    """Map role names to ids, querying only for a set of names not seen recently."""
+    key = frozenset(names)
+    if key in _role_ids_cache:
+        return _role_ids_cache[key]
+    value = await Role.ids_by_names(list(key))
+    _role_ids_cache[key] = value
+    return value
+
+
+async def cached_roles(role_ids: List[PydanticObjectId]) -> List[RoleScopesView]:
+    """Return the name and scopes of a set of roles, shared by every user holding the same set."""
+    key = tuple(sorted(role_ids))
+    if key in _role_set_cache:
+        return _role_set_cache[key]
+    async with _role_set_locks[key]:
+        # Concurrent misses on the same set share the first caller's query
+        if key in _role_set_cache:
+            return _role_set_cache[key]
+        generation = _generation
+        try:
+            value = await Role.find({"_id": {"$in": role_ids}}).project(RoleScopesView).to_list()
+        finally:
+            _role_set_locks.pop(key, None)
+        if generation == _generation:
+            _role_set_cache[key] = value
+    return value
+
+
+def clear_scopes() -> None:
+    """Drop every cached entry, used when a role definition changes."""
+    global _generation
+    _generation += 1
+    _role_set_cache.clear()
+    _role_ids_cache.clear()
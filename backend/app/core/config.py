@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import List
+from functools import cached_property
+from typing import List, FrozenSet
 from pydantic_settings import BaseSettings
 
 
@@ -18,6 +19,9 @@ class Settings(BaseSettings):
         mount_point: Mount point for API path
         db_name: db_name to be used to create the app mongo database
         db_conn_str: mongo connection string
+        db_max_idle_ms: Close pooled connections idle for longer than this
+        db_wait_queue_timeout_ms: Fail a checkout after waiting this long for a free pooled connection
+        db_compressors: Wire compressors offered to the server, comma separated
         allow_new_users: Allow new users or not
         magic_link_enabled: Magic Link emails enabled
         emails_enabled: If enabled, emails will be sent
@@ -38,6 +42,9 @@ class Settings(BaseSettings):
         user_default_password: The admin default password
         google_client_id: Google OAuth client ID
         magic_link_refresh_seconds: Magic link refresh interval in seconds
+        redis_url: Redis connection string shared by rate limiting, falls back to in-memory when empty
+        redis_max_connections: Connection pool size per Redis client
+        redis_socket_timeout: Seconds a Redis command may take before failing, bounds event loop stalls
     """
     app_name: str = "your_backend_app"
     app_domain: str = "http://localhost:5151"
@@ -66,14 +73,34 @@ class Settings(BaseSettings):
     apple_client_id: str = "change_me"
     magic_link_refresh_seconds: int = 60
     cors_origins: str = "http://localhost:3000,http://localhost:5173,*"
-    db_max_pool_size: int = 10
-    db_min_pool_size: int = 1
+    db_max_pool_size: int = 100
+    db_min_pool_size: int = 10
+    db_max_idle_ms: int = 300000
+    db_wait_queue_timeout_ms: int = 2000
+    db_compressors: str = "zlib"
+    redis_url: str = ""
+    redis_max_connections: int = 20
+    redis_socket_timeout: float = 0.5
 
     class Config:
         env_file = '.env'
         extra = "ignore"
 
-    @property
+    @cached_property
+    def redis_options(self) -> dict:
+        """
+            Connection options shared by every Redis client
+        """
+        return {
+            "max_connections": self.redis_max_connections,
+            "socket_timeout": self.redis_socket_timeout,
+            "socket_connect_timeout": self.redis_socket_timeout,
+            # Keep idle pooled sockets alive, and ping one idle longer than 30s before reusing it
+            "socket_keepalive": True,
+            "health_check_interval": 30,
+        }
+
+    @cached_property
     def mode(self) -> Mode:
         """
             Returns the application mode based on the database connection string.
@@ -81,18 +108,25 @@ class Settings(BaseSettings):
         """
         return Mode.dev if "localhost" in self.db_conn_str else Mode.prod
 
-    @property
+    @cached_property
     def default_admin_users(self) -> List:
         """
             Returns the default admin users formatted to a list
         """
         return self.admin_users.split('|')
 
+    @cached_property
+    def admin_users_set(self) -> FrozenSet[str]:
+        """
+            Returns the default admin users normalized to lowercase for O(1) membership checks
+        """
+        return frozenset(e.strip().lower() for e in self.admin_users.split('|') if e.strip())
+
     @property
     def main_app_description(self) -> str:
         return f"""{self.app_name} stater project"""
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> List[str]:
         """Returns CORS origins as a list"""
         return [origin.strip() for origin in self.cors_origins.split(',') if origin.strip()]
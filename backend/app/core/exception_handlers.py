@@ -1,8 +1,8 @@
 from typing import List, Dict, Any, Optional, Union
-import uuid
+import secrets
 
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from loguru import logger
@@ -11,15 +11,24 @@ from pydantic import ValidationError
 
 from app.core.config import settings, Mode
 
+INTERNAL_ERROR_MESSAGE = "Internal server error. Please contact support if the issue persists."
+RATE_LIMIT_RETRY_AFTER = 60
+
+# Fixed-message errors only differ by path and request id, so their bodies and headers are built once
+_RATE_LIMIT_ERROR = {
+    "code": status.HTTP_429_TOO_MANY_REQUESTS,
+    "message": f"Rate limit exceeded. Please try again in {RATE_LIMIT_RETRY_AFTER} seconds.",
+}
+_RATE_LIMIT_HEADERS = {"Retry-After": str(RATE_LIMIT_RETRY_AFTER)}
+_INTERNAL_ERROR = {
+    "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+    "message": INTERNAL_ERROR_MESSAGE,
+}
+
 
 def _get_request_id(request: Request) -> str:
-    """Extract request ID from state (set by middleware), header, or generate new one"""
-    return (
-        getattr(request.state, "request_id", None)
-        or request.headers.get("X-Request-ID")
-        or request.headers.get("x-request-id")
-        or str(uuid.uuid4().hex)
-    )
+    """Request ID set by RequestIDMiddleware, generating one only if the middleware did not run"""
+    return getattr(request.state, "request_id", None) or secrets.token_hex(16)
 
 
 def _get_client_ip(request: Request) -> Optional[str]:
@@ -46,7 +55,7 @@ def _create_error_response(
     request_id: str,
     details: Optional[List[Dict[str, str]]] = None,
     headers: Optional[Dict[str, str]] = None
-) -> JSONResponse:
+) -> ORJSONResponse:
     content: Dict[str, Any] = {
         "error": {
             "code": status_code,
@@ -58,14 +67,27 @@ def _create_error_response(
     if details:
         content["error"]["details"] = details
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status_code,
         content=content,
         headers=headers or {}
     )
 
 
-def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
+def _create_template_response(
+    template: Dict[str, Any],
+    path: str,
+    request_id: str,
+    headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=template["code"],
+        content={"error": {**template, "path": path, "request_id": request_id}},
+        headers=headers
+    )
+
+
+def http_exception_handler(request: Request, exc: StarletteHTTPException) -> ORJSONResponse:
     """Handle HTTP exceptions"""
     path = request.url.path
     request_id = _get_request_id(request)
@@ -81,7 +103,7 @@ def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSO
                 "original_detail": exc.detail
             }
         )
-        message = "Internal server error. Please contact support if the issue persists."
+        message = INTERNAL_ERROR_MESSAGE
     else:
         logger.warning(
             "HTTP {} error on {} {}: {}",
@@ -98,7 +120,7 @@ def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSO
     )
 
 
-def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+def validation_exception_handler(request: Request, exc: RequestValidationError) -> ORJSONResponse:
     """Handle FastAPI request validation errors"""
     path = request.url.path
     request_id = _get_request_id(request)
@@ -119,11 +141,10 @@ def validation_exception_handler(request: Request, exc: RequestValidationError)
     )
 
 
-def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> ORJSONResponse:
     """Handle rate limit exceeded errors"""
     path = request.url.path
     request_id = _get_request_id(request)
-    retry_after = 60
     logger.warning(
         "Rate limit exceeded on {} {}",
         request.method, path,
@@ -131,20 +152,14 @@ def rate_limit_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse
             "path": path,
             "client": _get_client_ip(request),
             "request_id": request_id,
-            "retry_after": retry_after
+            "retry_after": RATE_LIMIT_RETRY_AFTER
         }
     )
 
-    return _create_error_response(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        message=f"Rate limit exceeded. Please try again in {retry_after} seconds.",
-        path=path,
-        request_id=request_id,
-        headers={"Retry-After": str(retry_after)}
-    )
+    return _create_template_response(_RATE_LIMIT_ERROR, path, request_id, headers=_RATE_LIMIT_HEADERS)
 
 
-def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+def general_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
     """Handle all uncaught exceptions"""
     path = request.url.path
     request_id = _get_request_id(request)
@@ -155,15 +170,10 @@ def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
         extra={"path": path, "request_id": request_id}
     )
 
-    return _create_error_response(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        message="Internal server error. Please contact support if the issue persists.",
-        path=path,
-        request_id=request_id
-    )
+    return _create_template_response(_INTERNAL_ERROR, path, request_id)
 
 
-def pydantic_validation_handler(request: Request, exc: ValidationError) -> JSONResponse:
+def pydantic_validation_handler(request: Request, exc: ValidationError) -> ORJSONResponse:
     """Handle Pydantic validation errors"""
     path = request.url.path
     request_id = _get_request_id(request)
@@ -1,15 +1,19 @@
 import sys
-import json
+import orjson
 from datetime import datetime, timezone
 from typing import Any, Dict
 from loguru import logger
 from app.core.config import settings, Mode
 
-sensitive_keys = {'authorization', 'cookie', 'x-service-psk', 'x-api-key', 'password', 'token', 'secret'}
+_logging_configured = False
+
+sensitive_keys = frozenset({'authorization', 'cookie', 'x-service-psk', 'x-api-key', 'password', 'token', 'secret'})
 
 
 def sanitize_headers(headers: Dict[str, Any]) -> Dict[str, Any]:
     """Redact sensitive values from headers/extra data."""
+    if sensitive_keys.isdisjoint(str(k).lower() for k in headers):
+        return headers
     return {
         k: '***REDACTED***' if k.lower() in sensitive_keys else v
         for k, v in headers.items()
@@ -48,14 +52,14 @@ def serialize_record(record: Dict[str, Any]) -> str:
         if extra:
             subset["extra"] = sanitize_headers(extra)
 
-        return json.dumps(subset, default=str)
+        return orjson.dumps(subset, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
     except Exception as e:
-        return json.dumps({
+        return orjson.dumps({
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "level": "ERROR",
             "message": f"Log serialization failed: {e}",
             "original_message": str(record.get("message", ""))[:1000],
-        })
+        }).decode()
 
 
 def setup_logging() -> None:
@@ -63,7 +67,12 @@ def setup_logging() -> None:
     Configure logging based on environment mode.
     - Production: JSON format, INFO level, async logging to stdout
     - Development: Human-readable format, DEBUG level
+    Safe to call more than once, only the first call configures sinks.
     """
+    global _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
     logger.remove()
     if settings.mode == Mode.prod:
         def json_sink(message):
@@ -1,4 +1,4 @@
-import uuid
+import secrets
 
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
@@ -7,7 +7,7 @@ from starlette.requests import Request
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """Middleware to add request ID tracking for all requests."""
     async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+        request_id = request.headers.get("x-request-id") or secrets.token_hex(16)
         request.state.request_id = request_id
         response = await call_next(request)
         response.headers["x-request-id"] = request_id
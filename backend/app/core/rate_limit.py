@@ -0,0 +1,26 @@
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from app.core.config import settings
+
+# slowapi talks to its storage synchronously from the event loop, so the timeouts bound any stall
+_storage_options = settings.redis_options if settings.redis_url else {}
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.redis_url or "memory://",
+    storage_options=_storage_options,
+    strategy="moving-window",
+    # A storage outage falls back to per-process limits instead of failing the request
+    in_memory_fallback_enabled=True,
+    swallow_errors=True,
+)
+
+contact_limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.redis_url or "memory://",
+    storage_options=_storage_options,
+    strategy="fixed-window",
+    in_memory_fallback_enabled=True,
+    swallow_errors=True,
+)
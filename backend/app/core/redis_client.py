@@ -0,0 +1,14 @@
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from app.core.config import settings
+
+# Blocking pool: requests past max_connections wait for a free connection instead of erroring
+redis_client: Redis | None = Redis(
+    connection_pool=BlockingConnectionPool.from_url(settings.redis_url, **settings.redis_options)
+) if settings.redis_url else None
+
+
+async def close_redis() -> None:
+    """Release the shared connection pool on shutdown."""
+    if redis_client is not None:
+        await redis_client.aclose(close_connection_pool=True)
@@ -1,3 +1,6 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import  Optional
 
 from app.core.config import settings
@@ -12,6 +15,8 @@ JWT_SECRET_KEY = settings.secret_key
 JWT_REFRESH_SECRET_KEY = settings.authjwt_refresh_key
 
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt releases the GIL while hashing, so a core-sized thread pool keeps the event loop free and scales with CPUs
+hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
 if settings.mount_point:
     reusable_oauth = OAuth2PasswordBearer(tokenUrl=f"/{settings.mount_point}/auth/token",
                                            scheme_name="JWT",
@@ -49,3 +54,16 @@ def verify_password(password: str, hashed_pass: str) -> bool:
         return password_context.verify(password, hashed_pass)
     except Exception as e:
         return False
+
+
+async def get_hashed_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, get_hashed_password, password)
+
+
+async def warm_password_context() -> None:
+    """Load the hashing backend at startup rather than on the first login"""
+    await get_hashed_password_async("warm-up")
+
+
+async def verify_password_async(password: str, hashed_pass: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, verify_password, password, hashed_pass)
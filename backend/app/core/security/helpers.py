@@ -1,52 +1,89 @@
+import asyncio
+import time
+
 import httpx
 import jwt
-from async_lru import alru_cache
+import orjson
+from loguru import logger
 
-from app.core.security.api import verify_password, CustomOAuth2RequestForm
+from app.core.security.api import verify_password_async, CustomOAuth2RequestForm
 from app.core.config import settings
-from app.user.model import User, APIKey
+from app.user.model import User, UserAuthView, AuthFingerprint, APIKey
 from fastapi import HTTPException
 
 GOOGLE_KEYS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_CERTS_DEFAULT_TTL = 3600
 AUDIENCE = settings.google_client_id
 
+_google_certs: dict = {"jwks": None, "fetched_at": 0.0, "expires_at": 0.0}
+_google_certs_lock = asyncio.Lock()
+_google_http = httpx.AsyncClient(timeout=5.0, limits=httpx.Limits(max_keepalive_connections=4))
+
 
 async def password_authenticated_user(
         form: CustomOAuth2RequestForm,
-) -> User:
-    user = await User.by_email(form.username)
+) -> AuthFingerprint:
+    user = await User.auth_fingerprint(form.username)
     if user is None:
         raise HTTPException(status_code=401, detail="User does not exist")
     if not user.is_active:
         raise HTTPException(status_code=401, detail="Inactive user")
-    if not verify_password(form.password, user.password):
+    if not await verify_password_async(form.password, user.password):
         raise HTTPException(status_code=401, detail="Incorrect password")
     return user
 
 
 async def client_id_authenticated_user(
         form: CustomOAuth2RequestForm,
-) -> User | None:
-    user = await User.find_one({"api_keys.client_id": form.client_id})
+) -> UserAuthView | None:
+    user = await User.by_client_id_for_auth(form.client_id)
     if not user:
         raise HTTPException(status_code=401, detail="Bad client_id")
     if not user.is_active:
         raise HTTPException(status_code=401, detail="Inactive user")
-    api_key: APIKey = {a.client_id: a for a in user.api_keys}[form.client_id]
+    # The positional projection returns only the key matching client_id
+    api_key: APIKey | None = user.api_keys[0] if user.api_keys else None
+    if api_key is None:
+        raise HTTPException(status_code=401, detail="Bad client_id")
     if not api_key.active:
         raise HTTPException(status_code=401, detail="API key is disabled")
-    if not verify_password(form.client_secret, api_key.hashed_client_secret):
+    if not await verify_password_async(form.client_secret, api_key.hashed_client_secret):
         raise HTTPException(status_code=401, detail="Bad client_secret")
     user._using_api_key = True
     user._api_key = api_key
     return user
 
 
-@alru_cache(maxsize=1)  # Cache the latest certs
-async def fetch_google_certs():
-    async with httpx.AsyncClient() as client:
-        response = await client.get(GOOGLE_KEYS_URL)
-    return response.json()
+async def close_google_http() -> None:
+    """Release the pooled connection to Google on shutdown."""
+    await _google_http.aclose()
+
+
+def _max_age(cache_control: str) -> int:
+    for directive in cache_control.split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return int(value)
+    return GOOGLE_CERTS_DEFAULT_TTL
+
+
+async def fetch_google_certs(force_refresh: bool = False) -> dict:
+    """Google's JWKS, cached for its Cache-Control max-age, with concurrent refreshes collapsed into one fetch"""
+    requested_at = time.monotonic()
+    if not force_refresh and requested_at < _google_certs["expires_at"]:
+        return _google_certs["jwks"]
+    async with _google_certs_lock:
+        # Another coroutine may have refreshed while we waited on the lock
+        if _google_certs["fetched_at"] >= requested_at or (
+                not force_refresh and time.monotonic() < _google_certs["expires_at"]):
+            return _google_certs["jwks"]
+        response = await _google_http.get(GOOGLE_KEYS_URL)
+        response.raise_for_status()
+        now = time.monotonic()
+        _google_certs["jwks"] = orjson.loads(response.content)
+        _google_certs["fetched_at"] = now
+        _google_certs["expires_at"] = now + _max_age(response.headers.get("cache-control", ""))
+        return _google_certs["jwks"]
 
 async def validate_google_jwt(id_token):
     headers = jwt.get_unverified_header(id_token)
@@ -56,8 +93,7 @@ async def validate_google_jwt(id_token):
     jwks = await fetch_google_certs()
 
     if headers["kid"] not in [key["kid"] for key in jwks["keys"]]:
-        fetch_google_certs.cache_clear()
-        jwks = await fetch_google_certs()
+        jwks = await fetch_google_certs(force_refresh=True)
 
     public_key_info = next(key for key in jwks["keys"] if key["kid"] == headers["kid"])
 
@@ -68,8 +104,8 @@ async def validate_google_jwt(id_token):
         return decoded_token
     except jwt.ExpiredSignatureError:
         raise ValueError("JWT has expired")
-    except jwt.JWTClaimsError as e:
-        print(e, e.args)
+    except (jwt.InvalidAudienceError, jwt.InvalidIssuerError, jwt.MissingRequiredClaimError) as e:
+        logger.warning("JWT claims error: {}", e)
         raise ValueError("JWT claims error")
     except Exception as e:
         raise ValueError(f"Failed to decode the JWT: {e}")
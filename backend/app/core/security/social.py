@@ -1,9 +1,12 @@
+import asyncio
+import time
 from enum import Enum
-import json
-from pprint import pprint
-from typing import Callable, Awaitable
+from types import MappingProxyType
+from typing import Callable, Awaitable, Mapping
 import aiohttp
+import orjson
 import jwt
+from loguru import logger
 from fastapi import HTTPException
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token as google_id_token
@@ -12,6 +15,29 @@ from app.core.config import settings
 
 _GOOGLE_ISSUERS = {"accounts.google.com", "https://accounts.google.com"}
 
+APPLE_KEYS_URL = "https://appleid.apple.com/auth/keys"
+APPLE_KEYS_TTL = 3600
+
+_http_session: aiohttp.ClientSession | None = None
+_apple_keys: dict = {"keys": {}, "fetched_at": 0.0, "expires_at": 0.0}
+_apple_keys_lock = asyncio.Lock()
+
+
+def _session() -> aiohttp.ClientSession:
+    """Shared session so SSO calls reuse pooled keep-alive connections instead of a new TLS handshake each."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, limit_per_host=30, ttl_dns_cache=300, keepalive_timeout=75)
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared session on shutdown."""
+    if _http_session is not None:
+        await _http_session.close()
+
 
 async def exchange_google_sso_data_for_email(data: dict, redirect_uri: str = "") -> str:
     credential = data.get("credential")
@@ -46,10 +72,9 @@ async def exchange_microsoft_sso_data_for_email(
     access_token = data["access_token"]
     url = "https://graph.microsoft.com/v1.0/me"
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            user_data = await response.json()
-            return user_data.get("mail") or user_data.get("userPrincipalName")
+    async with _session().get(url, headers=headers) as response:
+        user_data = await response.json(loads=orjson.loads)
+        return user_data.get("mail") or user_data.get("userPrincipalName")
 
 
 async def exchange_facebook_sso_data_for_email(
@@ -58,26 +83,43 @@ async def exchange_facebook_sso_data_for_email(
     access_token = data["accessToken"]
     url = "https://graph.facebook.com/v13.0/me?fields=email"
     headers = {"Authorization": f"Bearer {access_token}"}
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            user_data = await response.json()
-            return user_data.get("email")
+    async with _session().get(url, headers=headers) as response:
+        user_data = await response.json(loads=orjson.loads)
+        return user_data.get("email")
+
+
+async def _refresh_apple_keys(requested_at: float, force: bool) -> None:
+    async with _apple_keys_lock:
+        # Another coroutine may have refreshed while we waited on the lock
+        if _apple_keys["fetched_at"] >= requested_at or (not force and time.monotonic() < _apple_keys["expires_at"]):
+            return
+        async with _session().get(APPLE_KEYS_URL) as response:
+            apple_keys = await response.json(loads=orjson.loads)
+        now = time.monotonic()
+        _apple_keys["keys"] = {
+            key["kid"]: jwt.algorithms.RSAAlgorithm.from_jwk(key) for key in apple_keys["keys"]
+        }
+        _apple_keys["fetched_at"] = now
+        _apple_keys["expires_at"] = now + APPLE_KEYS_TTL
+
+
+async def _get_apple_key(kid: str):
+    """Apple's parsed public key for a kid, cached for an hour and refetched once when the kid is unknown"""
+    requested_at = time.monotonic()
+    if requested_at >= _apple_keys["expires_at"]:
+        await _refresh_apple_keys(requested_at, force=False)
+    if kid not in _apple_keys["keys"]:
+        await _refresh_apple_keys(requested_at, force=True)
+    return _apple_keys["keys"].get(kid)
 
 
 async def exchange_apple_sso_data_for_email(data: dict, redirect_uri: str = "") -> str:
     access_token = data["authorization"]["id_token"]
-    apple_keys_url = "https://appleid.apple.com/auth/keys"
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(apple_keys_url) as response:
-            apple_keys = await response.json()
     unverified_header = jwt.get_unverified_header(access_token)
-    key = next((key for key in apple_keys['keys'] if key['kid'] == unverified_header['kid']), None)
-    if not key:
+    rsa_key = await _get_apple_key(unverified_header['kid'])
+    if not rsa_key:
         raise Exception("Matching public key not found in Apple's JWK set")
 
-    rsa_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-
     try:
         decoded_token = jwt.decode(
             access_token,
@@ -86,7 +128,7 @@ async def exchange_apple_sso_data_for_email(data: dict, redirect_uri: str = "")
             audience=settings.apple_client_id,
             issuer="https://appleid.apple.com"
         )
-        pprint(decoded_token)
+        logger.debug("Apple token decoded sub={}", decoded_token.get("sub"))
         return decoded_token.get('email')
     except jwt.exceptions.InvalidSignatureError:
         raise Exception("Signature verification failed")
@@ -104,6 +146,6 @@ class SsoProvider(str, Enum):
 
 SsoDataToEmailFunction = Callable[[dict, str], Awaitable[str]]
 
-provider_map: dict[SsoProvider, SsoDataToEmailFunction] = {
+provider_map: Mapping[SsoProvider, SsoDataToEmailFunction] = MappingProxyType({
     SsoProvider.GOOGLE: exchange_google_sso_data_for_email,
-}
+})
@@ -1,15 +1,19 @@
 import asyncio
+import time
 from typing import Optional
 import motor.motor_asyncio
-from beanie import Document, init_beanie
+from beanie import init_beanie
 from loguru import logger
 
-from app.core.security.api import password_context
+from app.core.security.api import get_hashed_password_async
 from app.core.config import settings
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
+from app.models import ALL_DOCUMENT_MODELS
 from app.role.model import Role
-from app.user.model import User
+from app.user.model import User, denormalized_roles
+
+HEALTH_CHECK_TTL_SECONDS = 2.0
 
 
 class DatabaseManager:
@@ -17,38 +21,35 @@ class DatabaseManager:
         self._client: Optional[AsyncIOMotorClient] = None
         self._database: Optional[AsyncIOMotorDatabase] = None
         self._is_initialized = False
+        self._last_ok: float = 0.0
+        self._ping_lock = asyncio.Lock()
 
     async def connect(self) -> None:
         if self._is_initialized:
             return
         try:
+            self._client = motor.motor_asyncio.AsyncIOMotorClient(
+                settings.db_conn_str,
+                maxPoolSize=settings.db_max_pool_size,
+                minPoolSize=settings.db_min_pool_size,
+                maxIdleTimeMS=settings.db_max_idle_ms,
+                waitQueueTimeoutMS=settings.db_wait_queue_timeout_ms,
+                heartbeatFrequencyMS=10000,
+                retryWrites=True,
+                compressors=settings.db_compressors,
+                serverSelectionTimeoutMS=5000,
+                connectTimeoutMS=10000,
+                socketTimeoutMS=20000,
+            )
             if settings.db_conn_str.startswith("mongodb://localhost"):
-                self._client = motor.motor_asyncio.AsyncIOMotorClient(
-                    settings.db_conn_str,
-                    maxPoolSize=settings.db_max_pool_size,
-                    minPoolSize=settings.db_min_pool_size,
-                    serverSelectionTimeoutMS=5000,
-                    connectTimeoutMS=10000,
-                    socketTimeoutMS=20000,
-                )
                 self._client.get_io_loop = asyncio.get_event_loop
-            else:
-                self._client = motor.motor_asyncio.AsyncIOMotorClient(
-                    settings.db_conn_str,
-                    maxPoolSize=settings.db_max_pool_size,
-                    minPoolSize=settings.db_min_pool_size,
-                    serverSelectionTimeoutMS=5000,
-                    connectTimeoutMS=10000,
-                    socketTimeoutMS=20000,
-                    authMechanism="DEFAULT"
-                )
 
             self._database = self._client[settings.db_name]
-            await self._client.admin.command('ping')
-            collections = Document.__subclasses__()
-            await init_beanie(database=self._database, document_models=collections)
+            # init_beanie's index setup performs server selection, so a separate ping is redundant
+            await init_beanie(database=self._database, document_models=list(ALL_DOCUMENT_MODELS))
 
             self._is_initialized = True
+            self._last_ok = time.monotonic()
             logger.info("Database connection established successfully")
 
         except Exception as e:
@@ -62,17 +63,25 @@ class DatabaseManager:
             self._client = None
             self._database = None
             self._is_initialized = False
+            self._last_ok = 0.0
             logger.info("Database connection closed")
 
     async def health_check(self) -> bool:
-        try:
-            if not self._client:
-                return False
-            await self._client.admin.command('ping')
-            return True
-        except Exception as e:
-            logger.warning(f"Database health check failed: {e}")
+        """Ping the server, reusing a successful result for HEALTH_CHECK_TTL_SECONDS"""
+        if not self._client:
             return False
+        if time.monotonic() - self._last_ok < HEALTH_CHECK_TTL_SECONDS:
+            return True
+        async with self._ping_lock:
+            if time.monotonic() - self._last_ok < HEALTH_CHECK_TTL_SECONDS:
+                return True
+            try:
+                await self._client.admin.command('ping')
+                self._last_ok = time.monotonic()
+                return True
+            except Exception as e:
+                logger.warning(f"Database health check failed: {e}")
+                return False
 
     @property
     def client(self) -> Optional[AsyncIOMotorClient]:
@@ -91,26 +100,33 @@ db_manager = DatabaseManager()
 
 
 async def wipe():
-    collections = Document.__subclasses__()
-    await asyncio.gather(*[model.delete_all() for model in collections])
+    await asyncio.gather(*[model.delete_all() for model in ALL_DOCUMENT_MODELS])
 
 async def create_app_admins():
-    admins = settings.default_admin_users
+    admins = [admin for admin in settings.default_admin_users if admin]
     await create_admin_role()
     admin_role = await Role.by_name("admin")
-    for admin in admins:
-        user = await User.by_email(admin)
-        if user is None:
-            pw = password_context.hash(settings.user_default_password)
-            admin_user = User(
-                email=admin,
-                roles=[admin_role.id],
-                source="basic",
-                email_confirmed= True,
-                password=pw,
-            )
-            await admin_user.create()
-            logger.info(f"Created user {admin}")
+    existing = {user.email for user in await User.find({"email": {"$in": admins}}).to_list()}
+    missing = [admin for admin in admins if admin not in existing]
+    if not missing:
+        return
+    pw = await get_hashed_password_async(settings.user_default_password)
+    admin_roles = await denormalized_roles([admin_role.id])
+    new_admins = [
+        User(
+            email=admin,
+            roles=[admin_role.id],
+            source="basic",
+            email_confirmed=True,
+            password=pw,
+            role_version=1,
+            **admin_roles,
+        )
+        for admin in missing
+    ]
+    await asyncio.gather(*[admin_user.create() for admin_user in new_admins])
+    for admin in missing:
+        logger.info(f"Created user {admin}")
 
 async def create_admin_role():
     role = await Role.by_name("admin")
@@ -13,13 +13,6 @@ async def get_database() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
             detail="Database connection not available"
         )
 
-    # Health check before providing database
-    if not await db_manager.health_check():
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database health check failed"
-        )
-
     yield db_manager.database
 
 
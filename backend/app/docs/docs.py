@@ -1,6 +1,8 @@
+from functools import lru_cache
 from app.core.config import settings
 
 
+@lru_cache(maxsize=1)
 def get_api_description() -> str:
     """Generate API description dynamically from settings"""
     return f"""
@@ -1,22 +1,28 @@
 import asyncio
 import time
+
+import orjson
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from scalar_fastapi import get_scalar_api_reference
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import ValidationError
 from fastapi import Request
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, Response
 
 from app.core.config import settings
 from app.core.middleware import RequestIDMiddleware
+from app.core.rate_limit import limiter
+from app.core.redis_client import close_redis, redis_client
+from app.core.security.api import warm_password_context
+from app.core.security.helpers import close_google_http
+from app.core.security.social import close_http_session
+from app.utills.dependencies import close_email_service
 from app.core.logging_config import setup_logging, get_logger
 from app.db.db_manager import db_manager, create_app_admins
 from app.auth.endpoints import auth_router
@@ -32,7 +38,7 @@ from app.core.exception_handlers import (
     general_exception_handler,
     pydantic_validation_handler
 )
-from app.utills.health_checks import check_database
+from app.utills.health_checks import check_database, check_redis, run_checks
 from app.docs.docs import get_api_description, tags_metadata
 
 setup_logging()
@@ -45,9 +51,14 @@ async def lifespan(app: FastAPI):
     app.state.db = db_manager
     await app.state.db.connect()
     await create_app_admins()
+    await warm_password_context()
     yield
     logger.debug(f"Stopping app...")
     await db_manager.disconnect()
+    await close_redis()
+    await close_google_http()
+    await close_http_session()
+    await close_email_service()
 
 
 def create_app(**kwargs) -> FastAPI:
@@ -56,25 +67,29 @@ def create_app(**kwargs) -> FastAPI:
     )
 
 
+root_path = f"/{settings.mount_point}" if settings.mount_point else None
+
 app = create_app(lifespan=lifespan,
                  title=settings.app_name,
                  description=get_api_description(),
-                 root_path=f"/{settings.mount_point}" if settings.mount_point else None,
-                 openapi_url=f"/openapi.json",
+                 root_path=root_path,
+                 # Set up front, since /openapi.json is served from the cached schema rather than per request
+                 servers=[{"url": root_path}] if root_path else None,
+                 openapi_url=None,
                  openapi_tags=tags_metadata,
                  docs_url=None,
                  redoc_url=None,
+                 default_response_class=ORJSONResponse,
                  middleware=[Middleware(CORSMiddleware,
                                         allow_origins=settings.cors_origins_list,
                                         allow_credentials=True,
                                         allow_methods=["*"],
-                                        allow_headers=["*"]
+                                        allow_headers=["*"],
+                                        expose_headers=["X-Next-Before", "X-Next-Before-Id"]
                                         ),
                              Middleware(RequestIDMiddleware)]
                  )
 
-limiter = Limiter(key_func=get_remote_address)
-
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
@@ -83,12 +98,14 @@ app.add_exception_handler(Exception, general_exception_handler)
 
 @app.middleware("http")
 async def log_access(request: Request, call_next):
-    start_time = time.monotonic()
+    path = request.url.path
+    if path.startswith("/health"):
+        return await call_next(request)
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = time.monotonic() - start_time
-    if not request.url.path.startswith("/health"):
-        request_id = getattr(request.state, "request_id", "-")
-        logger.info(f"[{request_id}] {request.method} {response.status_code} {process_time:.2f}s {request.url.path}")
+    process_time = time.perf_counter() - start_time
+    request_id = getattr(request.state, "request_id", "-")
+    logger.info(f"[{request_id}] {request.method} {response.status_code} {process_time:.2f}s {path}")
     return response
 
 
@@ -101,30 +118,21 @@ app.include_router(public_thread_router)
 
 
 
-@app.get("/health")
-async def health_check():
-    db_result = await check_database(db_manager)
-
-    health_status = {
-        "status": "healthy",
-        "services": {
-            "database": db_result,
-        }
-    }
-
-    all_healthy = all(
-        svc.get("status") == "healthy"
-        for svc in health_status["services"].values()
-    )
+async def _run_health_checks() -> tuple[int, dict]:
+    checks = {"database": lambda: check_database(db_manager)}
+    if redis_client is not None:
+        checks["redis"] = lambda: check_redis(redis_client)
+    services = await run_checks(checks)
+    if any(result.get("status") != "healthy" for result in services.values()):
+        return status.HTTP_503_SERVICE_UNAVAILABLE, {"status": "degraded", "services": services}
+    return status.HTTP_200_OK, {"status": "healthy", "services": services}
 
-    if not all_healthy:
-        health_status["status"] = "degraded"
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content=health_status
-        )
 
-    return health_status
+@app.get("/health")
+async def health_check():
+    """Composite health; each check caches its own result briefly, so bursts of probes share one round"""
+    status_code, content = await _run_health_checks()
+    return ORJSONResponse(status_code=status_code, content=content)
 
 
 @app.get("/health/ready")
@@ -132,7 +140,7 @@ async def readiness_check():
     """Readiness probe - checks if the application is ready to accept traffic."""
     db_result = await check_database(db_manager)
     if db_result.get("status") != "healthy":
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"ready": False, "reason": db_result.get("error", "Database not ready")}
         )
@@ -152,6 +160,18 @@ async def root():
     return RedirectResponse(url="/docs")
 
 
+_openapi_json: bytes | None = None
+
+
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi_json() -> Response:
+    """Serve the OpenAPI schema, serialized once from FastAPI's cached app.openapi()"""
+    global _openapi_json
+    if _openapi_json is None:
+        _openapi_json = orjson.dumps(app.openapi())
+    return Response(_openapi_json, media_type="application/json")
+
+
 @app.get("/docs", include_in_schema=False)
 async def app_documentation():
     return get_scalar_api_reference(
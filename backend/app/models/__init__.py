@@ -0,0 +1,6 @@
+from app.contact.model import Message
+from app.role.model import Role
+from app.user.magic_link_model import MagicLink, MagicLinkRateLimit
+from app.user.model import User
+
+ALL_DOCUMENT_MODELS = (User, Role, MagicLink, MagicLinkRateLimit, Message)
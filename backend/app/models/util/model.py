@@ -1,29 +1,41 @@
 import base64
+import binascii
 from enum import Enum
 from typing import Optional
 
-from pydantic import BaseModel, model_serializer, computed_field, Field
+from pydantic import BaseModel, model_serializer, Field
 
 
 class EmailAttachment(BaseModel):
     file_name: str = Field(description="Name of the attached file")
     file_data_encoded: Optional[str] = Field(default=None, description="Base64 encoded file data")
 
+    # (encoded, decoded) pair, so repeat reads of file_data skip the base64 decode
+    _file_data_cache: Optional[tuple[str, bytes]] = None
+
     def __init__(self, file_name: str, file_data: Optional[bytes] = None, file_data_encoded: Optional[str] = None):
         super().__init__(file_name=file_name)
         self.file_name = file_name
-        self.file_data_encoded = self._b64enc(file_data) if file_data is not None else file_data_encoded
+        if file_data is not None:
+            self.file_data = file_data
+        else:
+            self.file_data_encoded = file_data_encoded
 
     def _b64enc(self, v) -> str:
         return base64.b64encode(v).decode("utf-8")
 
-    @computed_field
+    @property
     def file_data(self) -> bytes:
-        return base64.b64decode(self.file_data_encoded)
+        cache = self._file_data_cache
+        if cache is None or cache[0] is not self.file_data_encoded:
+            cache = (self.file_data_encoded, binascii.a2b_base64(self.file_data_encoded))
+            self._file_data_cache = cache
+        return cache[1]
 
     @file_data.setter
     def file_data(self, new_file_data: bytes) -> None:
         self.file_data_encoded = self._b64enc(new_file_data)
+        self._file_data_cache = (self.file_data_encoded, bytes(new_file_data))
 
     @model_serializer()
     def serialize_model(self):
@@ -1,5 +1,6 @@
 from typing import List
 from fastapi import APIRouter, Query, Depends, Path
+from fastapi.responses import ORJSONResponse
 from app.role.model import RoleOut, RoleBase
 from app.user.model import User
 from app.models.util.model import Message
@@ -18,8 +19,10 @@ async def get_all_roles(
         skip: int = Query(0, ge=0),
         limit: int = Query(100, le=1000),
         role_service: RoleService = Depends(get_role_service)
-) -> List[RoleOut]:
-    return await role_service.get_all_roles(skip=skip, limit=limit)
+) -> ORJSONResponse:
+    roles = await role_service.get_all_roles(skip=skip, limit=limit)
+    # Already RoleOut instances: dump straight to orjson instead of re-validating against response_model
+    return ORJSONResponse(content=[role.model_dump(mode="json", by_alias=True) for role in roles])
 
 
 @role_router.get("/by_id/{role_id}", response_model=RoleOut, dependencies=[manage_roles])
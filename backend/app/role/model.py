@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Self
+from typing import List, Optional, Self
 
 from beanie import PydanticObjectId, Document
 from pydantic import BaseModel, Field
@@ -29,6 +29,18 @@ class RoleOut(RoleBase):
         }
     }
 
+class RoleScopesView(BaseModel):
+    """Projection carrying only what token scopes are built from"""
+    name: str = Field(description="Name of the role")
+    scopes: List[str] = Field(default_factory=list, description="List of permission scopes this role grants")
+
+
+class RoleIdName(BaseModel):
+    """Projection carrying only the id and name of a role"""
+    id: PydanticObjectId = Field(alias="_id", description="Unique identifier for the role")
+    name: str = Field(description="Name of the role")
+
+
 class Role(Document, RoleBase):
     class Settings:
         name = "Role"
@@ -42,9 +54,12 @@ class Role(Document, RoleBase):
         return self.id.generation_time
 
     @classmethod
-    async def all_roles(cls, skip: int = 0, limit: int = 100) -> List[Self]:
-        """Get all roles"""
-        return await cls.find().skip(skip).limit(limit).to_list()
+    async def all_roles(cls, skip: int = 0, limit: int = 100, projection: Optional[type[BaseModel]] = None) -> List[Self]:
+        """Get all roles, optionally projected to a lighter view"""
+        query = cls.find().skip(skip).limit(limit)
+        if projection is not None:
+            query = query.project(projection)
+        return await query.to_list()
 
     @classmethod
     async def by_id(cls, _id: PydanticObjectId | str) -> Self:
@@ -57,3 +72,9 @@ class Role(Document, RoleBase):
     async def by_name(cls, _name: str) -> Self:
         """Get a role by name"""
         return await cls.find_one({"name": _name})
+
+    @classmethod
+    async def ids_by_names(cls, names: List[str]) -> dict[str, PydanticObjectId]:
+        """Map role names to ids in one projected query"""
+        roles = await cls.find({"name": {"$in": names}}).project(RoleIdName).to_list()
+        return {role.name: role.id for role in roles}
@@ -1,23 +1,24 @@
 from typing import List
-from fastapi import HTTPException, BackgroundTasks
+from beanie import PydanticObjectId, UpdateResponse
+from fastapi import HTTPException
 from starlette import status
 
-from app.role.model import Role, RoleBase, RoleOut
+from app.role.model import Role, RoleBase, RoleIdName, RoleOut
 from app.user.model import User
 from app.models.util.model import Message
+from app.core.cache.scopes_cache import clear_scopes
+from app.core.cache.response_cache import cached, invalidate
 from app.tasks.background_tasks import ensure_ri_delete_role
 
 
 class RoleService:
     """Service for retrieving and updating roles"""
 
-    def __init__(self, bg: BackgroundTasks):
-        self.bg = bg
-
+    @cached("roles", key=lambda self, skip=0, limit=1000: (skip, limit))
     async def get_all_roles(self, skip: int = 0, limit: int = 1000) -> List[RoleOut]:
         """Get all roles with pagination"""
-        roles = await Role.all_roles(skip, limit)
-        return [RoleOut.model_validate(role.model_dump()) for role in roles]
+        # Projected straight into RoleOut, no Role document built and re-validated per row
+        return await Role.all_roles(skip, limit, projection=RoleOut)
 
     async def get_role_by_id(self, role_id: str) -> RoleOut:
         """Get a role by its ID"""
@@ -45,38 +46,50 @@ class RoleService:
         role_data.created_by = created_by
         new_role = Role(**role_data.model_dump())
         await new_role.insert()
+        clear_scopes()
+        invalidate("roles", "users")
         return RoleOut.model_validate(new_role.model_dump())
 
     async def update_role(self, role_id: str, role_update: RoleBase) -> RoleOut:
         """Update an existing role"""
-        role = await Role.by_id(role_id)
-        if not role:
+        try:
+            oid = PydanticObjectId(role_id)
+        except Exception:
             raise HTTPException(status_code=404, detail="Role not found")
 
-        # Check if updating name to an existing name
-        if role_update.name and role_update.name != role.name:
-            existing_role = await Role.by_name(role_update.name)
-            if existing_role:
-                raise HTTPException(status_code=400, detail="Role name already exists")
+        # Check if updating name to one another role already has
+        if role_update.name and await Role.find_one({"name": role_update.name, "_id": {"$ne": oid}}).project(RoleIdName):
+            raise HTTPException(status_code=400, detail="Role name already exists")
 
         update_data = role_update.model_dump(exclude_unset=True)
-        await role.update({"$set": update_data})
-
-        # Fetch updated role
-        updated_role = await Role.by_id(role_id)
+        # findOneAndUpdate: the write returns the updated role, no read before or after
+        updated_role = await Role.find_one({"_id": oid}).update(
+            {"$set": update_data}, response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        if not updated_role:
+            raise HTTPException(status_code=404, detail="Role not found")
+        clear_scopes()
+        await User.refresh_role_cache_where({"roles": oid})
+        invalidate("roles", "users")
         return RoleOut.model_validate(updated_role.model_dump())
 
     async def delete_role(self, role_id: str) -> Message:
-        """Delete a role with background referential integrity cleanup"""
+        """Delete a role and pull it from every user holding it"""
         role = await Role.by_id(role_id)
         if not role:
             raise HTTPException(status_code=404, detail="Role not found")
-        user_count = await User.find({"roles": role_id}).count()
+        # Pull the role from its users first, so a failed cleanup leaves the role untouched
+        cleanup = await ensure_ri_delete_role(role_id, role.name)
+        if not cleanup["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Could not remove the role from its users; the role was kept, please retry",
+            )
         await role.delete()
-        # Start background cleanup task
-        self.bg.add_task(ensure_ri_delete_role, role_id)
-        if user_count > 0:
-            return Message(message=f"Role deleted successfully. Removing from {user_count} users in background.")
+        clear_scopes()
+        invalidate("roles", "users")
+        if cleanup["users_updated"] > 0:
+            return Message(message=f"Role deleted successfully. Removed from {cleanup['users_updated']} users.")
         else:
             return Message(message="Role deleted successfully.")
 
@@ -86,10 +99,7 @@ class RoleService:
         return role is not None
 
     async def get_roles_by_ids(self, role_ids: List[str]) -> List[Role]:
-        """Get multiple roles by their IDs"""
-        roles = []
-        for role_id in role_ids:
-            role = await Role.by_id(role_id)
-            if role:
-                roles.append(role)
-        return roles
\ No newline at end of file
+        """Get multiple roles by their IDs in one query, in the order requested"""
+        ids = [PydanticObjectId(role_id) for role_id in role_ids]
+        roles_by_id = {role.id: role for role in await Role.find({"_id": {"$in": ids}}).to_list()}
+        return [roles_by_id[role_id] for role_id in ids if role_id in roles_by_id]
\ No newline at end of file
@@ -1,8 +1,10 @@
+from beanie import PydanticObjectId
 from loguru import logger
 from app.utills.email.email import EmailService
 from app.user.model import User
 from app.contact.model import MessageCreate
 from app.core.config import settings
+from app.core.cache.response_cache import invalidate
 
 
 async def send_welcome_email_task(email_service: EmailService, user_email: str, token: str) -> bool:
@@ -35,17 +37,17 @@ async def send_magic_link_email_task(email_service: EmailService, user_email: st
 async def send_contact_notification_task(email_service: EmailService, contact: MessageCreate) -> bool:
     """Background task to notify admin of new contact message"""
     try:
-        recipients = settings.default_admin_users if settings.admin_users else [settings.emails_from_email]
-        for recipient in recipients:
-            if not recipient:
-                continue
-            email = email_service.generate_contact_notification_email(
+        recipients = settings.admin_users_set or {settings.emails_from_email}
+        emails = [
+            email_service.generate_contact_notification_email(
                 sender_name=contact.name,
                 sender_email=str(contact.email),
                 message=contact.message,
                 recipient=recipient,
             )
-            await email_service.send_email_async(email)
+            for recipient in recipients if recipient
+        ]
+        await email_service.send_many(emails)
         return True
     except Exception as e:
         logger.error(f"Failed to send contact notification: {e}")
@@ -95,83 +97,50 @@ async def send_customer_reply_notification_task(
 ) -> bool:
     """Background task to notify admins when a visitor replies to a thread."""
     try:
-        recipients = settings.default_admin_users if settings.admin_users else [settings.emails_from_email]
+        recipients = settings.admin_users_set or {settings.emails_from_email}
         admin_link = f"{settings.app_domain}/admin/messages/{message_id}"
-        for recipient in recipients:
-            if not recipient:
-                continue
-            email = email_service.generate_customer_reply_notification_email(
+        emails = [
+            email_service.generate_customer_reply_notification_email(
                 sender_name=sender_name,
                 sender_email=sender_email,
                 reply_text=reply_text,
                 recipient=recipient,
                 admin_link=admin_link,
             )
-            await email_service.send_email_async(email)
+            for recipient in recipients if recipient
+        ]
+        await email_service.send_many(emails)
         return True
     except Exception as e:
         logger.error("Failed to send customer reply notification for message {}: {}", message_id, e)
         return False
 
 
-async def ensure_ri_delete_role(role_id: str) -> dict:
+async def ensure_ri_delete_role(role_id: str, role_name: str) -> dict:
     """Remove a role from all users who have it (referential integrity cleanup)"""
     try:
         logger.info(f"Starting referential integrity cleanup for role: {role_id}")
-        users_with_role = await User.has_role(role_id)
-        updated_users = []
-        failed_updates = []
-        if not users_with_role:
-            logger.info(f"No users found with role {role_id}, cleanup complete")
-            return {
-                "role_id": role_id,
-                "users_updated": 0,
-                "updated_user_ids": [],
-                "failed_updates": [],
-                "success": True
-            }
-
-        for user in users_with_role:
-            try:
-                if user and hasattr(user, 'roles'):
-                    original_role_count = len(user.roles)
-                    filtered_roles = [role for role in user.roles if str(role) != str(role_id)]
-
-                    if len(filtered_roles) != original_role_count:
-                        user.roles = filtered_roles
-                        await user.save()
-                        updated_users.append(user.id)
-                        logger.info(f"Removed role {role_id} from user {user.email}")
-                    else:
-                        logger.debug(f"User {user.email} did not have role {role_id}")
-            except Exception as user_error:
-                logger.error(f"Failed to update user {getattr(user, 'email', 'unknown')}: {user_error}")
-                failed_updates.append({
-                    "user_id": str(getattr(user, 'id', 'unknown')),
-                    "error": str(user_error)
-                })
-
-        result = {
+        # One update_many filtered on the role itself, so every current holder is pulled
+        role_oid = PydanticObjectId(role_id)
+        result = await User.find({"roles": role_oid}).update({"$pull": {"roles": role_oid}})
+        # Refresh whoever still carries the role in their denormalized fields, read after the pull,
+        # so a holder granted the role while the cleanup ran does not keep its scopes
+        await User.refresh_role_cache_where({"cached_role_names": role_name})
+        invalidate("users")
+
+        logger.info(f"Referential integrity cleanup completed successfully. Updated {result.modified_count} users.")
+        return {
             "role_id": role_id,
-            "users_updated": len(updated_users),
-            "updated_user_ids": [str(uid) for uid in updated_users],
-            "failed_updates": failed_updates,
-            "success": len(failed_updates) == 0
+            "users_updated": result.modified_count,
+            "failed_updates": [],
+            "success": True
         }
 
-        if failed_updates:
-            logger.warning(f"Referential integrity cleanup completed with {len(failed_updates)} failures. Updated {len(updated_users)} users.")
-        else:
-            logger.info(f"Referential integrity cleanup completed successfully. Updated {len(updated_users)} users.")
-
-        return result
-
     except Exception as e:
         logger.error(f"Referential integrity cleanup failed for role {role_id}: {e}")
         return {
             "role_id": role_id,
             "users_updated": 0,
-            "updated_user_ids": [],
             "failed_updates": [],
             "success": False,
             "error": str(e)
@@ -1,8 +1,8 @@
 from typing import List
 import secrets
-import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Body, Form, Request, BackgroundTasks, Path
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
 from app.user.model import UserAuth, UpdatePassword, UserBase, APIKey, UpdateAPIKey, UserOut, UserUpdateRequest, CreateAPIKeyRequest, CreateAPIKey
@@ -13,35 +13,33 @@ from app.tasks.background_tasks import send_reset_password_email_task
 from app.utills.dependencies import admin_access, CheckScope, get_user_service, get_self_user_service, \
     validate_link_token, get_email_service
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-
-limiter = Limiter(key_func=get_remote_address)
+from app.core.rate_limit import limiter
 
 user_router = APIRouter(tags=["User Management"], prefix="/user")
 app_admin = Depends(admin_access)
 manage_users = Depends(CheckScope("users.write"))
 
 
-@user_router.get("/all", dependencies=[app_admin, manage_users])
+@user_router.get("/all", response_model=List[UserOut], dependencies=[app_admin, manage_users])
 async def get_all_users(
         skip: int = 0,
         limit: int = 1000,
         user_service: UserService = Depends(get_user_service)
 
-) -> List[UserOut]:
+) -> ORJSONResponse:
     """Admin endpoint to get all users"""
-    return await user_service.get_all_users(skip, limit)
+    users = await user_service.get_all_users(skip, limit)
+    # Already UserOut instances: dump straight to orjson instead of re-validating against response_model
+    return ORJSONResponse(content=[user.model_dump(mode="json", by_alias=True) for user in users])
 
 
 @user_router.post("/register", dependencies=[manage_users, app_admin])
 async def create_user(
         user_register: UserAuth,
         user_service: UserService = Depends(get_user_service),
-):
+) -> UserBase:
     """Admin endpoint to create a new user"""
-    new_user = await user_service.create_user(user_register)
-    return UserBase(**new_user.model_dump())
+    return await user_service.create_user(user_register)
 
 
 @user_router.get("/by_id/{id}", dependencies=[app_admin, manage_users])
@@ -87,7 +85,7 @@ async def create_api_key(
 ) -> APIKey:
     """Admin Endpoint to create an API key for the specified user."""
     # Generate client_id and client_secret
-    client_id = str(uuid.uuid4())
+    client_id = secrets.token_urlsafe(16)
     client_secret = secrets.token_urlsafe(32)
 
     # Create CreateAPIKey model with unhashed credentials
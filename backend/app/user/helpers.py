@@ -34,12 +34,10 @@ async def validate_user_state_for_verification(user: User):
 
 
 
-async def generate_email(user: User, type: str, auth_service: AuthService):
+async def generate_email(user: User, type: str, auth_service: AuthService, email_service: EmailService):
     scopes, roles = await user.get_user_scopes_and_roles()
     access_token, at_expires = auth_service.create_access_token(subject=user.email, scopes=scopes, roles=roles)
 
-    email_service = EmailService()
-
     if type == "magic_link":
         return email_service.generate_magic_link_email(user_email=user.email, token=access_token)
     elif type == "recover_password":
@@ -5,6 +5,7 @@ from typing import Self, List
 from pydantic import BaseModel, Field
 from beanie import PydanticObjectId, Document
 from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 from fastapi import HTTPException
 
@@ -28,11 +29,40 @@ class MagicBase(BaseModel):
     }
 
 
+class MagicLinkRateLimit(Document):
+    """Cooldown sentinel, one per (identifier, link_type), claimed atomically before a link is issued"""
+    id: str = Field(description="identifier:link_type")
+    next_allowed_at: datetime = Field(description="When another link of this type may be requested")
+
+    class Settings:
+        name = "MagicLinkRateLimit"
+        indexes = [
+            IndexModel("next_allowed_at", expireAfterSeconds=0)
+        ]
+
+    @classmethod
+    async def claim(cls, identifier: PydanticObjectId | str, _type: MagicType) -> bool:
+        """Start a cooldown window, or return False if one is still running"""
+        now = datetime.now(UTC)
+        try:
+            # An elapsed window matches and is moved forward; a running one fails the filter,
+            # so the upsert collides with the existing _id instead
+            await cls.get_motor_collection().update_one(
+                {"_id": f"{identifier}:{_type.value}", "next_allowed_at": {"$lte": now}},
+                {"$set": {"next_allowed_at": now + timedelta(seconds=settings.magic_link_refresh_seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+
 class MagicLink(Document, MagicBase):
     class Settings:
         name = "MagicLinK"
         indexes = [
-            IndexModel("identifier", unique=False)
+            # Serves the identifier + type lookups with their newest-first sort; the prefix covers identifier alone
+            IndexModel([("identifier", 1), ("link_type", 1), ("_id", -1)]),
         ]
 
     @property
@@ -64,20 +94,11 @@ class MagicLink(Document, MagicBase):
 
     @classmethod
     async def request_magic(cls, identifier: PydanticObjectId | str, _type: MagicType) -> Self:
-        latest_links = await cls.by_identifier_and_type(identifier=identifier,_type= _type,limit= 1)
-        if latest_links:
-            latest_created_on = latest_links[0].created_on
-            _threshold = datetime.now(UTC) - timedelta(seconds=settings.magic_link_refresh_seconds)
-            if latest_created_on > _threshold:
-                raise HTTPException(status_code = 429, detail="Link cannot be requested again")
-            else:
-                magic_link = cls.generate_magic_link(identifier,_type, True)
-                await magic_link.save()
-                return magic_link
-        else:
-            magic_link = cls.generate_magic_link(identifier, _type,True)
-            await magic_link.save()  # Save to database
-            return magic_link
+        if not await MagicLinkRateLimit.claim(identifier, _type):
+            raise HTTPException(status_code = 429, detail="Link cannot be requested again")
+        magic_link = cls.generate_magic_link(identifier, _type, True)
+        await magic_link.insert()
+        return magic_link
 
     @classmethod
     def generate_magic_link(cls,identifier: PydanticObjectId,_type:MagicType, granted: bool)-> Self:
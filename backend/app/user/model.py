@@ -1,12 +1,15 @@
 from datetime import datetime, UTC
-from typing import List, Self, Optional, Tuple
+from typing import AsyncIterator, List, Self, Optional, Tuple
 from beanie import PydanticObjectId, Document
-from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from pymongo import IndexModel
 
-from app.role.model import RoleBase, Role
+from app.auth.service import SecurityExceptions
+from app.core.cache.response_cache import invalidate
+from app.core.cache.scopes_cache import cached_roles
+from app.role.model import RoleBase, Role, RoleOut
 
+PASSWORD_HISTORY_LENGTH = 5
 
 
 class Activity(BaseModel):
@@ -24,7 +27,7 @@ class Access(BaseModel):
 
 class APIKey(Access):
     client_id: str = Field(description="Unique identifier for the API client")
-    hashed_client_secret: str = Field(description="Hashed version of the client secret for security")
+    hashed_client_secret: str = Field(repr=False, description="Hashed version of the client secret for security")
 
 
 class PSK(Access):
@@ -55,8 +58,8 @@ class CreateAPIKeyRequest(BaseModel):
 class UserBase(BaseModel):
     """User Base Model"""
     username: Optional[str] = Field(None, alias="email", description="Username for the user account")
-    email: str = Field(None, alias="email", description="Email address of the user")
-    name: str | None = Field(None, alias="name", description="Full name of the user")
+    email: str = Field(None, description="Email address of the user")
+    name: str | None = Field(None, description="Full name of the user")
     source: str = Field(default="", description="Source system where the user originated")
     email_confirmed: bool = Field(default=False, description="Whether the user's email has been confirmed")
     is_active: bool = Field(default=True, description="Whether the user account is active")
@@ -64,21 +67,123 @@ class UserBase(BaseModel):
     api_keys: List[APIKey] = Field(default_factory=list, description="List of API keys associated with the user")
     roles: List[PydanticObjectId] = Field(default_factory=list, description="List of role IDs assigned to the user")
     last_login_activity: Optional[LoginActivity] = Field(default=None, description="Details of the user's last login")
-    last_passwords: List[str] = Field(default_factory=list, max_length=5, description="History of last 5 password hashes for security")
+    last_passwords: List[str] = Field(default_factory=list, max_length=PASSWORD_HISTORY_LENGTH, description=f"History of the last {PASSWORD_HISTORY_LENGTH} password hashes for security")
 
     # These properties are not serialized.
     _using_api_key: str | None = None
     """True when the current user has been authenticated via an API key instead of OAuth2. Not stored in DB."""
     _api_key: APIKey | None = None
     """If using_api_key is True, a valid reference to the API key that the user authenticated with."""
+    _scopes_and_roles: Tuple[List[str], List[str]] | None = None
+    """(scopes, role names) once resolved for the current request, shared by every dependency that checks them."""
 
     def get_api_key(self, client_id: str) -> APIKey:
-        api_key = [x for x in self.api_keys if x.client_id == client_id]
-        if len(api_key) == 0:
-            raise ValueError(f"API key {api_key} not found for user {self.name}")
-        return api_key[0]
+        # Scanned on each call: api_keys is mutated in place and holds only a handful of keys
+        for key in self.api_keys:
+            if key.client_id == client_id:
+                return key
+        raise ValueError(f"API key {client_id} not found for user {self.name}")
+
+
+
+
+async def scopes_and_roles_for(role_ids: List[PydanticObjectId]) -> Tuple[List[str], List[str]]:
+    """Resolve role ids into (scopes, role names), querying only when the role set is not cached"""
+    user_roles = await cached_roles(role_ids)
+    user_role_names: List = []
+    scopes: List = []
+    for role in user_roles:
+        prefix = role.name + ":"
+        user_role_names.append(role.name)
+        scopes.extend([prefix + scope for scope in role.scopes])
+    return scopes, user_role_names
+
+
+async def denormalized_roles(role_ids: List[PydanticObjectId]) -> dict:
+    """Role names and scopes to store on a user holding these roles"""
+    scopes, role_names = await scopes_and_roles_for(role_ids)
+    return {"cached_scopes": scopes, "cached_role_names": role_names}
+
+
+class DenormalizedRoles(BaseModel):
+    """Copy of the user's role names and scopes, so token issue needs no role query"""
+    cached_role_names: List[str] = Field(default_factory=list, description="Names of the user's roles at the last refresh")
+    cached_scopes: List[str] = Field(default_factory=list, description="Scopes of the user's roles at the last refresh")
+    role_version: int = Field(default=0, description="Bumped on each refresh; 0 means never denormalized")
+
+    async def get_user_scopes_and_roles(self) -> Tuple[List[str], List[str]]:
+        if self.role_version:
+            return list(self.cached_scopes), list(self.cached_role_names)
+        return await scopes_and_roles_for(self.roles)
+
+
+class UserRefreshView(DenormalizedRoles):
+    """Projection carrying the account status and current role claims for a token refresh"""
+    is_active: bool = Field(default=True, description="Whether the user account is active")
+    roles: List[PydanticObjectId] = Field(default_factory=list, description="List of role IDs assigned to the user")
 
 
+class AuthFingerprint(DenormalizedRoles):
+    """Projection carrying only the fields a password login reads"""
+    id: PydanticObjectId = Field(alias="_id", description="Unique identifier for the user")
+    email: str = Field(description="Email address of the user")
+    is_active: bool = Field(default=True, description="Whether the user account is active")
+    password: Optional[str] = Field(default=None, description="Hashed password for user authentication")
+    roles: List[PydanticObjectId] = Field(default_factory=list, description="List of role IDs assigned to the user")
+
+    _using_api_key: str | None = None
+    _api_key: APIKey | None = None
+
+
+class UserAuthView(AuthFingerprint):
+    """Projection carrying only the fields the login endpoints read"""
+    api_keys: List[APIKey] = Field(default_factory=list, description="List of API keys associated with the user")
+
+
+class UserApiKeyAuthView(AuthFingerprint):
+    """Projection for API key logins, carrying only the API key matched by the query"""
+    api_keys: List[APIKey] = Field(default_factory=list, description="The API key matching the queried client_id")
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "email": 1,
+            "is_active": 1,
+            "roles": 1,
+            "cached_role_names": 1,
+            "cached_scopes": 1,
+            "role_version": 1,
+            "api_keys.$": 1,
+        }
+
+
+class UserLinkView(AuthFingerprint):
+    """Projection for emailed links, carrying the login source and the denormalized scopes"""
+    source: str = Field(default="", description="Source system where the user originated")
+
+
+class UserIdOnly(BaseModel):
+    """Projection carrying only the identity of a user"""
+    id: PydanticObjectId = Field(alias="_id", description="Unique identifier for the user")
+    email: str = Field(description="Email address of the user")
+
+
+class UserListView(UserBase):
+    """Projection for user listings, leaving out password hashes"""
+    id: PydanticObjectId = Field(alias="_id", description="Unique identifier for the user")
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "email": 1,
+            "name": 1,
+            "source": 1,
+            "email_confirmed": 1,
+            "is_active": 1,
+            "api_keys": 1,
+            "roles": 1,
+            "last_login_activity": 1,
+        }
 
 
 class UserAuth(UserBase):
@@ -111,15 +216,20 @@ class UserUpdateRequest(BaseModel):
     api_keys: List[APIKey] = Field(default_factory=list, description="List of API keys associated with the user")
 
 
-class User(Document, UserAuth):
+class UserRolesView(BaseModel):
+    """Projection carrying only the role ids of a user"""
+    id: PydanticObjectId = Field(alias="_id", description="Unique identifier for the user")
+    roles: List[PydanticObjectId] = Field(default_factory=list, description="List of role IDs assigned to the user")
+
+
+class User(Document, UserAuth, DenormalizedRoles):
     class Settings:
         name = "User"
         indexes = [
             IndexModel("email", unique=True),
-            IndexModel("api_keys.client_id"),  # More specific index for API key lookups
+            IndexModel([("api_keys.client_id", 1), ("is_active", 1)]),  # API key lookups, prefix serves client_id alone
             IndexModel([("source", 1), ("email_confirmed", 1)]),  # Compound index for filtering
             IndexModel("roles"),  # Index for role-based queries
-            IndexModel("is_active"),  # Index for filtering active users
         ]
 
     def __repr__(self) -> str:
@@ -146,16 +256,53 @@ class User(Document, UserAuth):
         """Get all users"""
         return await cls.find().skip(skip).limit(limit).to_list()
 
+    @classmethod
+    async def iter_users(cls, skip: int = 0, limit: int = 100,
+                         projection: type[BaseModel] = UserListView) -> AsyncIterator[UserListView]:
+        """Stream a page of users, decoding each batch as it arrives"""
+        async for user in cls.find().skip(skip).limit(limit).project(projection):
+            yield user
+
     @classmethod
     async def by_username(cls, _username: str) -> Self:
-        """Get a user by email"""
-        return await cls.find_one({"username": _username})
+        """Get a user by username, which is stored as their email"""
+        return await cls.find_one({"email": _username})
 
     @classmethod
     async def by_email(cls, _email: str) -> Self:
         """Get a user by email"""
         return await cls.find_one({"email": _email})
 
+    @classmethod
+    async def by_email_for_refresh(cls, _email: str) -> Optional[UserRefreshView]:
+        """Get the account status and denormalized role claims of a user by email"""
+        return await cls.find_one({"email": _email}).project(UserRefreshView)
+
+    @classmethod
+    async def auth_fingerprint(cls, _email: str) -> Optional[AuthFingerprint]:
+        """Get the password login fields of a user by email"""
+        return await cls.find_one({"email": _email}).project(AuthFingerprint)
+
+    @classmethod
+    async def by_email_for_link(cls, _email: str) -> Optional[UserLinkView]:
+        """Get what a recovery or magic link email needs of a user, scopes included"""
+        return await cls.find_one({"email": _email}).project(UserLinkView)
+
+    @classmethod
+    async def by_email_for_auth(cls, _email: str) -> Optional[UserAuthView]:
+        """Get the login fields of a user by email"""
+        return await cls.find_one({"email": _email}).project(UserAuthView)
+
+    @classmethod
+    async def by_client_id_for_auth(cls, client_id: str) -> Optional[UserApiKeyAuthView]:
+        """Get the login fields of the user owning an API key, with only that key"""
+        return await cls.find_one({"api_keys.client_id": client_id}).project(UserApiKeyAuthView)
+
+    @classmethod
+    async def client_id_taken(cls, client_id: str) -> bool:
+        """Check whether any user already owns an API key with this client_id"""
+        return await cls.find_one({"api_keys.client_id": client_id}).project(UserIdOnly) is not None
+
     @classmethod
     async def by_id(cls, _id: PydanticObjectId | str) -> Self:
         """Get a user by id"""
@@ -164,36 +311,58 @@ class User(Document, UserAuth):
         return await cls.get(_id)
 
     @classmethod
-    async def by_client_id(cls, client_id: str, raise_on_zero=True) -> Self:
-        results = await cls.find({"api_keys.client_id": client_id}).to_list()
+    async def by_client_id(cls, client_id: str, raise_on_zero=True, projection: Optional[type[BaseModel]] = None) -> Self:
+        query = cls.find({"api_keys.client_id": client_id}).limit(2)
+        if projection is not None:
+            query = query.project(projection)
+        results = await query.to_list()
         if len(results) == 0:
             if raise_on_zero:
-                raise HTTPException(status_code=401, detail="Invalid API Key: No matching user found.")
+                raise SecurityExceptions.INVALID_API_KEY_NO_USER
             return None
         if len(results) >= 2:
-            raise HTTPException(status_code=401, detail="Invalid API Key: More than one matching user.")
+            raise SecurityExceptions.INVALID_API_KEY_DUPLICATE
         return results[0]
 
     @classmethod
-    async def has_role(cls, role_id: PydanticObjectId | str ) -> List[Self]:
+    async def has_role(cls, role_id: PydanticObjectId | str ) -> List[UserIdOnly]:
         if isinstance(role_id, str):
             role_id = PydanticObjectId(role_id)
-        results = await cls.find({"roles": role_id}).to_list()
+        results = await cls.find({"roles": role_id}).project(UserIdOnly).to_list()
         return results
 
     async def user_roles(self) -> List[RoleBase]:
         """Get all user roles, by their ids"""
-        roles = await Role.find({"_id": {"$in": self.roles}}).to_list()
+        roles = await Role.find({"_id": {"$in": self.roles}}).project(RoleOut).to_list()
         return roles
 
-    async def get_user_scopes_and_roles(self) -> Tuple[List[str], List[str]]:
-        user_roles = await self.user_roles()
-        user_role_names: List = [role.name for role in user_roles]
-        scopes: List = [f"{role.name}:{scope}" for role in user_roles for scope in role.scopes]
-        return scopes, user_role_names
+    async def refresh_role_cache(self):
+        """Recompute the denormalized role names and scopes, persisted by the caller's next save"""
+        for field, value in (await denormalized_roles(self.roles)).items():
+            setattr(self, field, value)
+        self.role_version += 1
+
+    @classmethod
+    async def refresh_role_cache_where(cls, query: dict):
+        """Recompute the denormalized roles of matching users, one update per distinct role set"""
+        by_role_set: dict[tuple, list[PydanticObjectId]] = {}
+        for user in await cls.find(query).project(UserRolesView).to_list():
+            by_role_set.setdefault(tuple(user.roles), []).append(user.id)
+        for role_ids, user_ids in by_role_set.items():
+            await cls.find({"_id": {"$in": user_ids}}).update({
+                "$set": await denormalized_roles(list(role_ids)),
+                "$inc": {"role_version": 1},
+            })
 
     def log_login(self, payload: dict):
         self.last_login_activity = LoginActivity(
             activity_date=datetime.now(UTC),
             payload=payload,
         )
+
+    @classmethod
+    async def record_login(cls, user_id: PydanticObjectId, payload: dict):
+        """Persist the last login activity as a partial $set by id, without loading the user"""
+        await cls.find_one({"_id": user_id}).set({cls.last_login_activity: LoginActivity(payload=payload)})
+        # The user listing shows last login activity
+        invalidate("users")
@@ -1,14 +1,17 @@
+import asyncio
 from typing import List
 from fastapi import HTTPException, BackgroundTasks
 from starlette import status
 
-from app.core.security.api import verify_password, get_hashed_password, password_context
+from app.core.security.api import verify_password_async, get_hashed_password_async
 from app.auth.model import Token
 from app.user.magic_link_model import MagicLink, MagicType
-from app.role.model import Role
-from app.user.model import UserAuth, User, UserBase, UserOut, APIKey, UpdateAPIKey, UserUpdateRequest, CreateAPIKey
+from app.role.model import Role, RoleIdName, RoleOut
+from app.user.model import PASSWORD_HISTORY_LENGTH, UserAuth, User, UserBase, UserOut, UserApiKeyAuthView, UserIdOnly, UserLinkView, APIKey, UpdateAPIKey, UserUpdateRequest, CreateAPIKey
 from app.models.util.model import Message
 from app.auth.service import AuthService
+from app.core.cache.scopes_cache import cached_role_ids
+from app.core.cache.response_cache import cached, invalidate
 from app.utills.email.email import EmailService
 from app.tasks.background_tasks import send_welcome_email_task, send_reset_password_email_task, \
     send_magic_link_email_task
@@ -26,13 +29,24 @@ class UserService:
         self.auth_service = auth_service
         self.bg = bg
 
+    @cached("users", key=lambda self, skip=0, limit=1000: (skip, limit))
     async def get_all_users(self, skip: int = 0, limit: int = 1000) -> List[UserOut]:
-        response: List[UserOut] = []
-        users = await User.all_users(skip, limit)
-        for user in users:
-            user_roles = await user.user_roles()
-            response.append(UserOut(**user.model_dump(exclude={'roles'}), roles=user_roles))
-        return response
+        # Collect role ids while the cursor streams, so the page is walked once before the role query
+        users: List = []
+        role_ids: set = set()
+        async for user in User.iter_users(skip, limit):
+            users.append(user)
+            role_ids.update(user.roles)
+        # Resolve every user's roles in one query instead of one round trip per user
+        roles = await Role.find({"_id": {"$in": list(role_ids)}}).project(RoleOut).to_list()
+        roles_by_id = {role.id: role for role in roles}
+        # Replace each view with its output in place rather than building a second list
+        for i, user in enumerate(users):
+            users[i] = UserOut(
+                **user.model_dump(exclude={'roles'}),
+                roles=[roles_by_id[role_id] for role_id in user.roles if role_id in roles_by_id],
+            )
+        return users
 
     async def get_user_by_id(self, user_id: str):
         user = await User.by_id(user_id)
@@ -43,48 +57,60 @@ class UserService:
         return user
 
     async def create_user(self, user_register: UserAuth):
-        if _ := await self.get_user_by_email(user_register.email):
+        # Independent lookups and the bcrypt hash run concurrently
+        existing, roles, hashed_password = await asyncio.gather(
+            User.find_one({"email": user_register.email}).project(UserIdOnly),
+            Role.find({"_id": {"$in": user_register.roles}}).project(RoleIdName).to_list(),
+            get_hashed_password_async(user_register.password),
+        )
+        if existing:
             raise HTTPException(
                 status_code=400,
                 detail="User already exists",
             )
+        found_roles = {role.id for role in roles}
         for role in user_register.roles:
-            if not (_ := await Role.by_id(role)):
+            if role not in found_roles:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Role with id {role} does not exist",
                 )
-        hashed_password = get_hashed_password(user_register.password)
         user_register.password = hashed_password
         new_user = User(**user_register.model_dump())
+        await new_user.refresh_role_cache()
         await User.insert(new_user)
+        invalidate("users")
         email, token = await self.generate_user_tuple_for_email(new_user)
         self.bg.add_task(send_welcome_email_task, self.email_service, email, token)
         return new_user
 
     async def update_user(self, user_update: UserUpdateRequest) -> UserOut:
-        user = await self.get_user_by_id(user_update.id)
+        user, ids_by_name = await asyncio.gather(
+            self.get_user_by_id(user_update.id),
+            cached_role_ids(user_update.roles),
+        )
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Convert role names to ObjectIds
         role_ids = []
         for role_name in user_update.roles:
-            role = await Role.by_name(role_name)
-            if not role:
+            role_id = ids_by_name.get(role_name)
+            if not role_id:
                 raise HTTPException(status_code=404, detail=f"Role '{role_name}' not found")
-            role_ids.append(role.id)
+            role_ids.append(role_id)
 
         # Update user fields directly
         update_data = user_update.model_dump(exclude_unset=True, exclude={'roles', 'id'})
         for field, value in update_data.items():
             setattr(user, field, value)
         user.roles = role_ids
+        # The role details for the response are fetched alongside the denormalized scopes
+        _, user_roles = await asyncio.gather(user.refresh_role_cache(), user.user_roles())
 
         await user.save()
+        invalidate("users")
 
-        # Return UserOut with full role details
-        user_roles = await user.user_roles()
         return UserOut(**user.model_dump(exclude={'roles'}), roles=user_roles)
 
     async def delete_user(self, user_id: str) -> Message:
@@ -93,6 +119,7 @@ class UserService:
             raise HTTPException(status_code=404, detail="User not found")
 
         await user.delete()
+        invalidate("users")
         return Message(message="User deleted successfully")
 
     async def current_user(self, token: Token):
@@ -111,7 +138,7 @@ class UserService:
         return user
 
     async def recover_password(self, email: str) -> Message:
-        user = await User.by_email(email)
+        user = await User.by_email_for_link(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         if user.source == "Basic" or user.password is not None:
@@ -123,53 +150,62 @@ class UserService:
             raise HTTPException(status_code=400, detail="User is not authenticated via password.")
 
     async def create_api_key(self, api_key: CreateAPIKey, email: str) -> APIKey:
-        existing_api_key = await User.by_client_id(api_key.client_id, raise_on_zero=False)
-        if existing_api_key:
+        taken, user, hashed_client_secret = await asyncio.gather(
+            User.client_id_taken(api_key.client_id),
+            User.by_email(email),
+            get_hashed_password_async(api_key.client_secret),
+        )
+        if taken:
             raise HTTPException(status_code=400, detail="API key already exists.")
-        user = await User.by_email(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         new_api_key = APIKey(
             client_id=api_key.client_id,
-            hashed_client_secret=password_context.hash(api_key.client_secret),
+            hashed_client_secret=hashed_client_secret,
             scopes=api_key.scopes,
             active=api_key.active
         )
         user.api_keys.append(new_api_key)
         await user.save()
+        invalidate("users")
         return new_api_key
 
     async def update_api_key(self, key_updates: UpdateAPIKey) -> APIKey:
-        user = await User.by_client_id(key_updates.client_id, raise_on_zero=False)
+        # Positional projection: only the matched key comes back, and only it is rewritten
+        user = await User.by_client_id(key_updates.client_id, raise_on_zero=False, projection=UserApiKeyAuthView)
         if not user:
             raise HTTPException(status_code=400, detail="Could not find user for API key")
+        if not user.api_keys:
+            raise HTTPException(status_code=400, detail="Could not find API key")
 
-        for i, key in enumerate(user.api_keys):
-            if key.client_id == key_updates.client_id:
-                to_update = key_updates.model_dump(
-                    exclude={"client_secret"},
-                    exclude_unset=True
-                )
-                if key_updates.client_secret:
-                    to_update["hashed_client_secret"] = password_context.hash(key_updates.client_secret)
-                key = key.model_copy(update=to_update)
-                user.api_keys[i] = key
-                await user.save()
-                return key
-        raise HTTPException(status_code=400, detail="Could not find API key")
+        to_update = key_updates.model_dump(
+            exclude={"client_secret"},
+            exclude_unset=True
+        )
+        if key_updates.client_secret:
+            to_update["hashed_client_secret"] = await get_hashed_password_async(key_updates.client_secret)
+        key = user.api_keys[0].model_copy(update=to_update)
+        await User.find_one({"_id": user.id, "api_keys.client_id": key_updates.client_id}).update(
+            {"$set": {"api_keys.$": key.model_dump()}}
+        )
+        invalidate("users")
+        return key
 
     async def delete_api_key(self, client_id: str) -> Message:
-        linked_user = await User.by_client_id(client_id)
+        # Pull the key and read back only the owner's email in one round trip
+        linked_user = await User.get_motor_collection().find_one_and_update(
+            {"api_keys.client_id": client_id},
+            {"$pull": {"api_keys": {"client_id": client_id}}},
+            projection={"email": 1},
+        )
         if not linked_user:
             raise HTTPException(status_code=404, detail="API key not found")
-
-        linked_user.api_keys = [key for key in linked_user.api_keys if key.client_id != client_id]
-        await linked_user.save()
+        invalidate("users")
         return Message(message="API key deleted successfully")
 
     async def send_magic_link(self, email: str) -> Message:
-        user = await User.by_email(email)
+        user = await User.by_email_for_link(email)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
         if user.source.lower() == "basic" or user.password is not None:
@@ -185,16 +221,20 @@ class UserService:
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         if user.source == "Basic":
-            hashed_password = get_hashed_password(new_password)
-            if hashed_password in user.last_passwords:
+            # Every stored hash has its own salt, so reuse can only be found by verifying against each one;
+            # the verifications run side by side on the hashing pool instead of one after another
+            previous = ([user.password] if user.password else []) + user.last_passwords[:PASSWORD_HISTORY_LENGTH]
+            if any(await asyncio.gather(*(verify_password_async(new_password, hashed) for hashed in previous))):
                 raise HTTPException(400, "Unable to reset password: User has already used this password.")
-            user.password = hashed_password
+            if user.password:
+                user.last_passwords = previous[:PASSWORD_HISTORY_LENGTH]
+            user.password = await get_hashed_password_async(new_password)
             await user.save()
             return Message(message="Password reset successfully")
         else:
             raise HTTPException(400, "Unable to reset password: User is not authenticated via password.")
 
-    async def generate_user_tuple_for_email(self, user: User) -> tuple[str, str]:
+    async def generate_user_tuple_for_email(self, user: User | UserLinkView) -> tuple[str, str]:
         scopes, roles = await user.get_user_scopes_and_roles()
         access_token, at_expires = self.auth_service.create_access_token(subject=user.email, scopes=scopes, roles=roles)
         return user.email, access_token
@@ -210,15 +250,16 @@ class MyUserService:
         return self.me
 
     async def update_my_password(self, old_password: str, new_password: str) -> Message:
-        if not verify_password(new_password, self.me.hashed_password):
-            raise HTTPException(status_code=400, detail="Incorrect password")
+        # The string comparison is free, so it runs before any bcrypt work
         if new_password == old_password:
             raise HTTPException(
                 status_code=400, detail="New password cannot be the same as the current one"
             )
-        hashed_password = get_hashed_password(new_password)
+        if not await verify_password_async(old_password, self.me.password):
+            raise HTTPException(status_code=400, detail="Incorrect password")
+        hashed_password = await get_hashed_password_async(new_password)
+        await User.find_one({"_id": self.me.id}).update({"$set": {"password": hashed_password}})
         self.me.password = hashed_password
-        await self.me.save()
         return Message(message="Password updated successfully")
 
     async def update_my_user(self, user_update: UserBase) -> User:
@@ -226,8 +267,10 @@ class MyUserService:
         for field, value in update_data.items():
             setattr(self.me, field, value)
         await self.me.save()
+        invalidate("users")
         return self.me
 
     async def delete_my_user(self):
         await self.me.delete()
+        invalidate("users")
         return Message(message="Password updated successfully")
@@ -1,8 +1,7 @@
-from typing import TypeVar
+from typing import List, Tuple, TypeVar
 from fastapi import HTTPException, Depends, BackgroundTasks
 from app.core.security.api import  reusable_oauth
 from app.auth.model import Token, Policy, RefreshTokenReq
-from app.role.model import Role
 from app.user.model import User
 from app.auth.service import SecurityService, AuthService
 from app.utills.email.email import EmailService
@@ -12,27 +11,35 @@ from app.contact.service import MessageService
 
 T = TypeVar('T')
 
+_email_service = EmailService()
 
-def get_role_service(bg: BackgroundTasks) -> RoleService:
+
+async def close_email_service() -> None:
+    """Close the shared SMTP session on shutdown"""
+    await _email_service.close()
+
+
+async def get_role_service() -> RoleService:
     """Dependency to get role service instance"""
-    return RoleService(bg)
+    return RoleService()
 
-def get_email_service():
-    return EmailService()
+async def get_email_service() -> EmailService:
+    """Shared EmailService so the Jinja environment and templates are built once per process"""
+    return _email_service
 
 
-def get_message_service() -> MessageService:
+async def get_message_service() -> MessageService:
     return MessageService()
 
 
-def get_security_service() -> SecurityService:
+async def get_security_service() -> SecurityService:
     return SecurityService(password_policy=Policy())
 
 
-def get_auth_service(security_service=Depends(get_security_service)) -> AuthService:
+async def get_auth_service(security_service=Depends(get_security_service)) -> AuthService:
     return AuthService(security_service)
 
-def get_user_service(
+async def get_user_service(
         email_service: EmailService = Depends(get_email_service),
         auth_service: AuthService = Depends(get_auth_service),
         bg: BackgroundTasks = BackgroundTasks(),
@@ -40,25 +47,25 @@ def get_user_service(
     return UserService(email_service, auth_service, bg)
 
 
-def valid_token(token: str,
+async def valid_token(token: str,
                 security_service: SecurityService = Depends(get_security_service)
                 ):
     return security_service.validate_access_token(token)
 
 
-def valid_access_token(token: str = Depends(reusable_oauth),
+async def valid_access_token(token: str = Depends(reusable_oauth),
                        security_service: SecurityService = Depends(get_security_service)
                        ):
     return security_service.validate_access_token(token)
 
 
-def validate_refresh_token(req: RefreshTokenReq,
+async def validate_refresh_token(req: RefreshTokenReq,
                            security_service: SecurityService = Depends(get_security_service)
                            ) -> Token:
-    return security_service.validate_access_token(req.refreshToken)
+    return security_service.validate_refresh_token(req.refreshToken)
 
 
-def validate_link_token(token: str,
+async def validate_link_token(token: str,
                         security_service: SecurityService = Depends(get_security_service)
                         ) -> Token:
     if token.startswith("Bearer "):
@@ -76,13 +83,20 @@ async def current_user(
     return await user_service.current_user(token)
 
 
-def get_self_user_service(me: User = Depends(current_user)):
+async def get_self_user_service(me: User = Depends(current_user)):
     return MyUserService(me)
 
 
+async def request_scopes(user: User) -> Tuple[List[str], List[str]]:
+    """The user's (scopes, role names), resolved once per request on the request's user"""
+    if user._scopes_and_roles is None:
+        user._scopes_and_roles = await user.get_user_scopes_and_roles()
+    return user._scopes_and_roles
+
+
 async def admin_access(user: User = Depends(current_user)) -> User:
-    user_roles = [r.name for r in await user.user_roles()]
-    if "admin" in user_roles:
+    _, user_role_names = await request_scopes(user)
+    if "admin" in user_role_names:
         return user
     else:
         raise HTTPException(
@@ -101,17 +115,15 @@ class CheckScope:
             else:
                 raise HTTPException(status_code=403, detail=f"API key is missing scope: {self.scope}")
         else:
-            user_roles = await user.user_roles()
-            if not user_roles:
+            scopes, role_names = await request_scopes(user)
+            if not role_names:
                 raise HTTPException(status_code=403,
                                     detail="User is not authorized to access, or does not contain any roles")
-            all_roles: dict[str, Role] = {r.name: r for r in (await Role.all().to_list())}
-            for role in user_roles:
-                if role.name == "admin":
-                    """User is an admin. Has global access"""
-                    return
-                if self.scope in all_roles[role.name].scopes:
-                    """Scope is in role scopes, and user has it assigned"""
-                    return
-            else:
-                raise HTTPException(status_code=403, detail=f"Missing scope: {self.scope}")
+            if "admin" in role_names:
+                """User is an admin. Has global access"""
+                return
+            # Resolved scopes are stored as "<role name>:<scope>"
+            if any(f"{name}:{self.scope}" in scopes for name in role_names):
+                """Scope is in role scopes, and user has it assigned"""
+                return
+            raise HTTPException(status_code=403, detail=f"Missing scope: {self.scope}")
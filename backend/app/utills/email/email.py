@@ -1,9 +1,11 @@
+import asyncio
+import mimetypes
+from email.message import EmailMessage
+from email.utils import formataddr
 from pathlib import Path
 from jinja2 import  Environment, FileSystemLoader
 from typing import Any
-import emails
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import aiosmtplib
 from loguru import logger
 
 from app.core.config import settings
@@ -12,76 +14,102 @@ from app.models.util.model import EmailData
 
 
 
+_jinja_env = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "email-templates" / "built"),
+    autoescape=True,
+    auto_reload=False,
+)
+# Built templates ship with the app, so compile them all once per process and skip per-render lookups
+_templates = {name: _jinja_env.get_template(name) for name in _jinja_env.list_templates()}
+
+
 class EmailService:
     def __init__(self):
-        template_dir = Path(__file__).parent / "email-templates" / "built"
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(template_dir),
-            autoescape=True
-        )
-        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.jinja_env = _jinja_env
+        self._templates = _templates
+        # One SMTP session reused across sends, so bursts pay the TCP and TLS handshake once
+        self._smtp: aiosmtplib.SMTP | None = None
+        self._smtp_lock = asyncio.Lock()
 
     def render_email_template(self,
                               template_name: str,
                               context: dict[str, Any]) -> str:
         try:
-            template = self.jinja_env.get_template(template_name)
+            template = self._templates.get(template_name) or self.jinja_env.get_template(template_name)
             return template.render(context)
         except Exception as e:
             logger.error(f"Failed to render email template {template_name}: {e}")
             raise
 
     async def send_email_async(self, email: EmailData) -> bool:
-        loop = asyncio.get_event_loop()
-        try:
-            result = await loop.run_in_executor(self.executor, self._send_email_sync, email)
-            return result
-        except Exception as e:
-            logger.error(f"Failed to send email to {email.to}: {e}")
-            return False
-
-    def _send_email_sync(self, email: EmailData) -> bool:
         if not settings.emails_enabled:
             logger.warning("Email sending is disabled in settings")
             return False
         try:
-            message = emails.Message(
-                subject=email.subject,
-                html=email.html_content,
-                mail_from=(settings.emails_from_name, settings.emails_from_email),
-            )
-
-            for attachment in email.attachments or []:
-                message.attach(filename=attachment.file_name, data=attachment.file_data)
-            smtp_options = {
-                "host": settings.smtp_host,
-                "port": settings.smtp_port,
-                "timeout": 30  # Add timeout
-            }
-            if settings.smtp_tls:
-                smtp_options["tls"] = True
-            elif settings.smtp_ssl:
-                smtp_options["ssl"] = True
-
-            if settings.smtp_user:
-                smtp_options["user"] = settings.smtp_user
-            if settings.smtp_password:
-                smtp_options["password"] = settings.smtp_password
-
-            response = message.send(to=email.to, smtp=smtp_options)
-            if response.status_code == 250:
-                logger.info(f"Email sent successfully to {email.to}")
-                return True
-            else:
-                logger.error(f"Failed to send email to {email.to}: {response}")
-                return False
-
+            await self._send(self._build_message(email))
+            logger.info(f"Email sent successfully to {email.to}")
+            return True
         except Exception as e:
             logger.error(f"Error sending email to {email.to}: {e}")
             return False
 
-    def send_email(self, email: EmailData) -> bool:
-        return self._send_email_sync(email)
+    async def send_many(self, emails: list[EmailData]) -> list[bool]:
+        """Send several emails in turn over the shared SMTP session"""
+        return [await self.send_email_async(email) for email in emails]
+
+    async def close(self) -> None:
+        async with self._smtp_lock:
+            await self._drop_connection()
+
+    async def _send(self, message: EmailMessage) -> None:
+        async with self._smtp_lock:
+            try:
+                smtp = await self._connection()
+                try:
+                    await smtp.send_message(message)
+                except aiosmtplib.SMTPServerDisconnected:
+                    # The server closed the idle session, reconnect once
+                    self._smtp = None
+                    smtp = await self._connection()
+                    await smtp.send_message(message)
+            except Exception:
+                await self._drop_connection()
+                raise
+
+    async def _connection(self) -> aiosmtplib.SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(
+                hostname=settings.smtp_host,
+                port=settings.smtp_port,
+                username=settings.smtp_user or None,
+                password=settings.smtp_password or None,
+                start_tls=settings.smtp_tls,
+                use_tls=settings.smtp_ssl and not settings.smtp_tls,
+                timeout=30,
+            )
+            await smtp.connect()
+            self._smtp = smtp
+        return self._smtp
+
+    async def _drop_connection(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+    def _build_message(self, email: EmailData) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = email.subject
+        message["From"] = formataddr((settings.emails_from_name, settings.emails_from_email))
+        message["To"] = email.to if isinstance(email.to, str) else ", ".join(email.to)
+        message.set_content(email.html_content, subtype="html")
+        for attachment in email.attachments or []:
+            mime_type = mimetypes.guess_type(attachment.file_name)[0] or "application/octet-stream"
+            maintype, subtype = mime_type.split("/", 1)
+            message.add_attachment(attachment.file_data, maintype=maintype, subtype=subtype, filename=attachment.file_name)
+        return message
 
     def generate_reset_password_email(self, reset_email: str, token: str) -> EmailData:
         subject = f"Password recovery for {reset_email}"
@@ -206,7 +234,3 @@ class EmailService:
             },
         )
         return EmailData(to=recipient, html_content=html_content, subject=subject)
-
-    def __del__(self):
-        if hasattr(self, 'executor'):
-            self.executor.shutdown(wait=False)
@@ -1,12 +1,73 @@
 import asyncio
-from typing import Dict, Any
+import time
+from collections import defaultdict
+from functools import wraps
+from typing import Awaitable, Callable, Dict, Any, Tuple, TYPE_CHECKING
 
 from loguru import logger
 
-from app.db.db_manager import DatabaseManager
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from app.db.db_manager import DatabaseManager
 
+HEALTH_CHECK_CACHE_TTL_SECONDS = 1.0
+# Overall wall time for a composite check, kept under typical readiness probe timeouts
+HEALTH_CHECK_BUDGET_SECONDS = 2.0
+# After this many unhealthy results in a row, a backend is only probed once per cooldown
+HEALTH_CHECK_FAILURE_THRESHOLD = 3
+HEALTH_CHECK_COOLDOWN_SECONDS = 10.0
 
-async def check_database(db_manager: DatabaseManager, health_check_timeout: float = 3.0) -> Dict[str, Any]:
+# Last result per check as (monotonic time, result), so probe bursts share one round trip to each backend
+_check_results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_check_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+# Circuit breaker state per check: consecutive unhealthy results, and when probing may resume
+_check_failures: Dict[str, int] = defaultdict(int)
+_check_open_until: Dict[str, float] = defaultdict(float)
+
+
+def _servable(key: str, hit: Tuple[float, Dict[str, Any]] | None, ttl: float) -> bool:
+    """Whether a stored result may be served: still fresh, or its breaker is open"""
+    if hit is None:
+        return False
+    now = time.monotonic()
+    return now - hit[0] < ttl or now < _check_open_until[key]
+
+
+def cached_check(key: str, ttl: float = HEALTH_CHECK_CACHE_TTL_SECONDS):
+    """Serve a check's last result for ttl seconds, with concurrent misses sharing one probe.
+
+    A backend that keeps failing is left alone for a cooldown, serving its last unhealthy result.
+    """
+    def decorator(check: Callable[..., Awaitable[Dict[str, Any]]]):
+        @wraps(check)
+        async def wrapper(*args, **kwargs) -> Dict[str, Any]:
+            hit = _check_results.get(key)
+            if _servable(key, hit, ttl):
+                return hit[1]
+            async with _check_locks[key]:
+                # Another caller may have probed while we waited on the lock
+                hit = _check_results.get(key)
+                if _servable(key, hit, ttl):
+                    return hit[1]
+                result = await check(*args, **kwargs)
+                now = time.monotonic()
+                if result.get("status") == "healthy":
+                    _check_failures[key] = 0
+                else:
+                    _check_failures[key] += 1
+                    if _check_failures[key] >= HEALTH_CHECK_FAILURE_THRESHOLD:
+                        # A failed trial after the cooldown reopens the breaker straight away
+                        logger.warning(f"{key} unhealthy {_check_failures[key]} times in a row, "
+                                       f"pausing probes for {HEALTH_CHECK_COOLDOWN_SECONDS}s")
+                        _check_open_until[key] = now + HEALTH_CHECK_COOLDOWN_SECONDS
+                _check_results[key] = (now, result)
+                return result
+        return wrapper
+    return decorator
+
+
+@cached_check("database")
+async def check_database(db_manager: "DatabaseManager", health_check_timeout: float = 3.0) -> Dict[str, Any]:
     """Check database health with timeout"""
     try:
         async with asyncio.timeout(health_check_timeout):
@@ -18,3 +79,40 @@ async def check_database(db_manager: DatabaseManager, health_check_timeout: floa
     except Exception as e:
         logger.warning(f"Database health check failed: {e}")
         return {"status": "unhealthy", "type": "mongodb", "error": str(e)}
+
+
+@cached_check("redis")
+async def check_redis(redis_client: "Redis", health_check_timeout: float = 3.0) -> Dict[str, Any]:
+    """Check redis health with timeout"""
+    try:
+        async with asyncio.timeout(health_check_timeout):
+            await redis_client.ping()
+        return {"status": "healthy", "type": "redis"}
+    except asyncio.TimeoutError:
+        logger.warning("Redis health check timed out")
+        return {"status": "unhealthy", "type": "redis", "error": "Health check timed out"}
+    except Exception as e:
+        logger.warning(f"Redis health check failed: {e}")
+        return {"status": "unhealthy", "type": "redis", "error": str(e)}
+
+
+async def run_checks(checks: Dict[str, Callable[[], Awaitable[Dict[str, Any]]]],
+                     budget: float = HEALTH_CHECK_BUDGET_SECONDS) -> Dict[str, Dict[str, Any]]:
+    """Run independent checks concurrently within one time budget, reporting unfinished ones as unknown"""
+    async def guarded(name: str, check: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            return await check()
+        except Exception as e:
+            logger.warning(f"{name} health check failed: {e}")
+            return {"status": "unhealthy", "error": str(e)}
+
+    tasks = {name: asyncio.create_task(guarded(name, check)) for name, check in checks.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    for name, task in tasks.items():
+        if task in pending:
+            logger.warning(f"{name} health check exceeded the {budget}s budget")
+            task.cancel()
+    return {
+        name: {"status": "unknown", "error": "Health check budget exceeded"} if task in pending else task.result()
+        for name, task in tasks.items()
+    }
@@ -1,39 +1,52 @@
 import asyncio
 import base64
 import functools
-import os
+from secrets import token_hex
 
 from cryptography.fernet import Fernet
 from loguru import logger
 
 
 def generate_random_text(length: int = 16):
-    return os.urandom(length).hex()
+    return token_hex(length)
 
-def convert_to_key(psk: str):
-    repetitions = (32 // len(psk)) + 1
-    modified_psk = (psk * repetitions)[:32]
-    return base64.urlsafe_b64encode(modified_psk.encode())
+@functools.lru_cache(maxsize=128)
+def convert_to_key(psk: str) -> bytes:
+    # Repeat the encoded bytes, so the key is exactly 32 bytes even for non-ASCII keys
+    psk_bytes = psk.encode()
+    return base64.urlsafe_b64encode((psk_bytes * (32 // len(psk_bytes) + 1))[:32])
+
+
+@functools.lru_cache(maxsize=128)
+def _cipher(psk: str) -> Fernet:
+    """Fernet for a pre-shared key, built once instead of on every message"""
+    return Fernet(convert_to_key(psk))
 
 
 def encrypt_message(message: str, key: str):
-    key = convert_to_key(key)
-    cipher_suite = Fernet(key)
-    encrypted_message = cipher_suite.encrypt(message.encode())
+    encrypted_message = _cipher(key).encrypt(message.encode())
     return encrypted_message.decode()
 
 
 def decrypt_message(encrypted_message: str, key: str):
-    key = convert_to_key(key)
-    cipher_suite = Fernet(key)
-    decrypted_message = cipher_suite.decrypt(encrypted_message.encode()).decode()
+    decrypted_message = _cipher(key).decrypt(encrypted_message.encode()).decode()
     return decrypted_message
 
+# Strong references to running fire_and_forget tasks; the event loop only keeps weak ones
+_background_tasks: set[asyncio.Task] = set()
+
+
 def fire_and_forget(f):
+    """Schedule the coroutine as a task when called, logging any exception it ends with"""
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error in {f.__name__}: {task.exception()}")
+
     @functools.wraps(f)
-    async def wrapper(*args, **kwargs):
-        try:
-            return asyncio.create_task(f(*args, **kwargs))
-        except Exception as e:
-            logger.error(f"Error in {f.__name__}: {e}")
+    def wrapper(*args, **kwargs) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(f(*args, **kwargs))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        task.add_done_callback(_log_failure)
+        return task
     return wrapper
\ No newline at end of file
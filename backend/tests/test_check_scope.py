@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+
+from app.user.model import User
+from app.utills.dependencies import CheckScope
+
+
+def make_user(role_names, role_scopes) -> User:
+    with patch("beanie.odm.documents.Document.get_motor_collection"):
+        return User(
+            email="user@example.com",
+            password="hashed",
+            cached_role_names=role_names,
+            cached_scopes=role_scopes,
+            role_version=1,
+        )
+
+
+class CheckScopeTests(unittest.IsolatedAsyncioTestCase):
+    async def test_non_admin_with_scope_passes(self):
+        user = make_user(["editor"], ["editor:messages.read"])
+        self.assertIsNone(await CheckScope("messages.read")(user))
+
+    async def test_non_admin_without_scope_is_forbidden(self):
+        user = make_user(["editor"], ["editor:messages.read"])
+        with self.assertRaises(HTTPException) as ctx:
+            await CheckScope("messages.write")(user)
+        self.assertEqual(ctx.exception.status_code, 403)
+
+    async def test_admin_passes_any_scope(self):
+        user = make_user(["admin"], ["admin:admin"])
+        self.assertIsNone(await CheckScope("users.write")(user))
+
+    async def test_user_without_roles_is_forbidden(self):
+        user = make_user([], [])
+        with self.assertRaises(HTTPException) as ctx:
+            await CheckScope("messages.read")(user)
+        self.assertEqual(ctx.exception.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
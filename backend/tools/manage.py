@@ -1,3 +1,4 @@
+import functools
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -5,15 +6,22 @@ from loguru import logger
 import questionary
 
 env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(env_path)
+
+
+@functools.cache
+def _load_env():
+    """Load .env once, only after an action that needs it has been picked"""
+    load_dotenv(env_path)
 
 
 def start_api_only():
     """Start just the FastAPI server for development"""
+    _load_env()
     logger.info("Starting FastAPI server...")
     backend_dir = Path(__file__).parent.parent
     os.chdir(backend_dir)
-    os.system("uvicorn app.main:app --reload --host 127.0.0.1 --port 8000")
+    # Replace this process with uvicorn rather than forking a shell to run it
+    os.execvp("uvicorn", ["uvicorn", "app.main:app", "--reload", "--host", "127.0.0.1", "--port", "8000"])
 
 
 actions = {